@@ -28,14 +28,24 @@ from .const import (
     CONF_ENCRYPTION_VERSION,
     CONF_HVAC_MODES,
     CONF_TEMP_SENSOR_OFFSET,
+    CONF_RELAY,
+    CONF_RELAY_SECRET,
+    CONF_TELEMETRY_EXPORT,
     CONF_UID,
     DEFAULT_HVAC_MODES,
     DEFAULT_PORT,
     DOMAIN,
+    LIVE_OPTION_KEYS,
     OPTION_KEYS,
 )
-
-PLATFORMS = [Platform.CLIMATE, Platform.NUMBER]
+from .discovery import async_get_discovery_index
+from .export import EXPORT_FORMATS
+from .gree_protocol import async_close_relays
+from .services import async_setup_services
+
+PLATFORMS = [Platform.CLIMATE, Platform.NUMBER, Platform.SENSOR]
+# Entry keys a running device can pick up without a reload (the host changes when a device is found at a new IP)
+LIVE_CONFIG_KEYS = {*LIVE_OPTION_KEYS, CONF_HOST}
 _LOGGER = logging.getLogger(__name__)
 
 # YAML configuration schema
@@ -51,6 +61,9 @@ CLIMATE_SCHEMA = vol.Schema(
         vol.Optional(CONF_HVAC_MODES, default=DEFAULT_HVAC_MODES): vol.All(cv.ensure_list, [cv.string]),
         vol.Optional(CONF_DISABLE_AVAILABLE_CHECK, default=False): cv.boolean,
         vol.Optional(CONF_TEMP_SENSOR_OFFSET): cv.boolean,
+        vol.Optional(CONF_RELAY): cv.string,
+        vol.Optional(CONF_RELAY_SECRET): cv.string,
+        vol.Optional(CONF_TELEMETRY_EXPORT): vol.In(EXPORT_FORMATS),
     }
 )
 
@@ -59,6 +72,8 @@ CONFIG_SCHEMA = vol.Schema({DOMAIN: vol.All(cv.ensure_list, [CLIMATE_SCHEMA])},
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the Gree component from yaml."""
+    await async_setup_services(hass)
+
     if DOMAIN not in config:
         return True
 
@@ -79,21 +94,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if DOMAIN not in hass.data:
         hass.data[DOMAIN] = {}
 
-    # Combine entry data with options
-    combined_data = {**entry.data}
-    for key, value in entry.options.items():
-        if key not in OPTION_KEYS:
-            _LOGGER.debug("Ignoring unexpected option key %s", key)
-            continue
-        if value is None:
-            combined_data.pop(key, None)
-        else:
-            combined_data[key] = value
+    combined_data = _combine_entry_data(entry)
 
     # Create the Gree device instance here and store it
     from .climate import create_gree_device
 
-    device = await create_gree_device(hass, combined_data)
+    device = await create_gree_device(hass, combined_data, entry.entry_id)
 
     # Store both the config data and the device instance
     hass.data[DOMAIN][entry.entry_id] = {
@@ -101,23 +107,55 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "device": device,
     }
 
+    # Keep the MAC->IP index warm while any entry is loaded
+    async_get_discovery_index(hass).async_start()
+
     _LOGGER.debug("Setting up config entry %s with data: %s", entry.entry_id, combined_data)
     entry.async_on_unload(entry.add_update_listener(_update_listener))
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
+def _combine_entry_data(entry: ConfigEntry) -> dict:
+    """Combine entry data with options."""
+    combined_data = {**entry.data}
+    for key, value in entry.options.items():
+        if key not in OPTION_KEYS:
+            _LOGGER.debug("Ignoring unexpected option key %s", key)
+            continue
+        if value is None:
+            combined_data.pop(key, None)
+        else:
+            combined_data[key] = value
+    return combined_data
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unloaded = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unloaded:
         _LOGGER.debug("Unloaded config entry %s", entry.entry_id)
         hass.data[DOMAIN].pop(entry.entry_id)
+        await async_close_relays()
+        if not any(other.entry_id in hass.data[DOMAIN] for other in hass.config_entries.async_entries(DOMAIN)):
+            async_get_discovery_index(hass).async_stop()
     return unloaded
 
 
 async def _update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
-    _LOGGER.debug("Options updated for entry %s: %s", entry.entry_id, entry.options)
+    _LOGGER.debug("Entry %s updated, options: %s", entry.entry_id, entry.options)
+    entry_data = hass.data[DOMAIN].get(entry.entry_id)
+    combined_data = _combine_entry_data(entry)
+    if entry_data is not None:
+        previous = entry_data["config"]
+        changed = {key for key in previous.keys() | combined_data.keys() if previous.get(key) != combined_data.get(key)}
+        if changed <= LIVE_CONFIG_KEYS:
+            # Keep the running device (cipher, binding, resolver history) and apply the options in place
+            _LOGGER.debug("Applying changed options %s to config entry %s in place", changed, entry.entry_id)
+            entry_data["config"] = combined_data
+            entry_data["device"].apply_options(combined_data)
+            return
+
     _LOGGER.debug("Reloading config entry %s after options update", entry.entry_id)
     await hass.config_entries.async_reload(entry.entry_id)
@@ -0,0 +1,174 @@
+"""
+Record and replay raw Gree protocol datagrams.
+
+A capture file starts with MAGIC, followed by append-only records of
+`<timestamp: float64><direction: uint8><length: uint32><payload>`, where
+direction 0 is a request sent to the device and 1 is its response.
+
+The replay server answers requests from a capture on loopback with the
+recorded timing. It has no Home Assistant dependencies:
+
+    python capture.py replay greehp_capture_<mac>_<time>.bin --port 7000
+"""
+
+# Standard library imports
+import argparse
+import asyncio
+import logging
+import os
+import struct
+import threading
+import time
+from collections import deque
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"GREECAP1"
+REQUEST = 0
+RESPONSE = 1
+_RECORD = struct.Struct("<dBI")
+
+
+class CaptureWriter:
+    """
+    Buffers datagrams in memory and appends them to a capture file on flush.
+
+    `write` runs on the event loop while `flush` and `close` run in the
+    executor; the owner flushes periodically so a crash only loses the
+    datagrams of the last interval.
+    """
+
+    def __init__(self, path):
+        # Opened here so callers can create the writer in an executor
+        self.path = path
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "ab")
+        if new_file:
+            self._file.write(MAGIC)
+        self._buffer = bytearray()
+        # Guards the buffer swap, and keeps concurrent flushes from reordering records
+        self._buffer_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self.records = 0
+
+    def write(self, direction, payload, timestamp=None):
+        """Buffer one datagram; cheap enough to call from the event loop."""
+        record = _RECORD.pack(time.time() if timestamp is None else timestamp, direction, len(payload)) + payload
+        with self._buffer_lock:
+            self._buffer += record
+            self.records += 1
+
+    def flush(self):
+        with self._file_lock:
+            with self._buffer_lock:
+                data, self._buffer = self._buffer, bytearray()
+            if data and not self._file.closed:
+                self._file.write(data)
+                self._file.flush()
+
+    def close(self):
+        self.flush()
+        with self._file_lock:
+            self._file.close()
+
+
+def read_capture(path):
+    """Yield (timestamp, direction, payload) records from a capture file."""
+    with open(path, "rb") as capture_file:
+        if capture_file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a Gree capture file")
+        while True:
+            header = capture_file.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                return
+            timestamp, direction, length = _RECORD.unpack(header)
+            payload = capture_file.read(length)
+            if len(payload) < length:
+                return  # truncated last record
+            yield timestamp, direction, payload
+
+
+def load_exchanges(path):
+    """Pair each request with the response that followed it (None if it got none)."""
+    exchanges = []
+    pending = None
+    for timestamp, direction, payload in read_capture(path):
+        if direction == REQUEST:
+            if pending is not None:
+                exchanges.append((pending[1], None, None))
+            pending = (timestamp, payload)
+        elif pending is not None:
+            exchanges.append((pending[1], timestamp - pending[0], payload))
+            pending = None
+    if pending is not None:
+        exchanges.append((pending[1], None, None))
+    return exchanges
+
+
+class ReplayProtocol(asyncio.DatagramProtocol):
+    """Answers each request with the response recorded for the same bytes."""
+
+    def __init__(self, exchanges, speed=1.0):
+        self._speed = speed
+        self._responses = {}
+        self._last = {}
+        for request, delay, response in exchanges:
+            self._responses.setdefault(request, deque()).append((delay, response))
+        self._transport = None
+
+    def connection_made(self, transport):
+        self._transport = transport
+
+    def datagram_received(self, data, addr):
+        queue = self._responses.get(data)
+        if queue:
+            delay, response = queue.popleft()
+            self._last[data] = (delay, response)
+        elif data in self._last:
+            # Recorded exchanges used up: keep answering like the last time
+            delay, response = self._last[data]
+        else:
+            _LOGGER.warning("No recorded exchange for request from %s: %s", addr, data[:80])
+            return
+        if response is None:
+            return  # the device did not answer this one either
+        asyncio.get_running_loop().call_later(delay / self._speed, self._transport.sendto, response, addr)
+
+
+async def serve_replay(path, host="127.0.0.1", port=7000, speed=1.0):
+    """Serve a capture file until cancelled."""
+    exchanges = load_exchanges(path)
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: ReplayProtocol(exchanges, speed), local_addr=(host, port))
+    _LOGGER.info("Replaying %d exchanges from %s on %s:%d", len(exchanges), path, host, port)
+    try:
+        await asyncio.Future()
+    finally:
+        transport.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gree protocol capture tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    replay = subparsers.add_parser("replay", help="answer requests from a capture file")
+    replay.add_argument("path")
+    replay.add_argument("--host", default="127.0.0.1")
+    replay.add_argument("--port", type=int, default=7000)
+    replay.add_argument("--speed", type=float, default=1.0, help="timing speed-up factor")
+    dump = subparsers.add_parser("dump", help="list the records of a capture file")
+    dump.add_argument("path")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "replay":
+        try:
+            asyncio.run(serve_replay(args.path, args.host, args.port, args.speed))
+        except KeyboardInterrupt:
+            pass
+    else:
+        for timestamp, direction, payload in read_capture(args.path):
+            print(f"{timestamp:.3f} {'>' if direction == REQUEST else '<'} {len(payload)} {payload[:120]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,14 @@ This module defines the climate (HVAC) unit for the Gree integration.
 """
 
 # Standard library imports
+import asyncio
 import base64
 import logging
 import math
+import time
+from collections import deque
 from datetime import timedelta
+from functools import partial
 
 # Third-party imports
 try:
@@ -18,7 +22,7 @@ except ImportError:
 from Crypto.Cipher import AES
 
 # Home Assistant imports
-from homeassistant.components.climate import ClimateEntity, ClimateEntityFeature, HVACMode
+from homeassistant.components.climate import ATTR_CURRENT_TEMPERATURE, ClimateEntity, ClimateEntityFeature, HVACMode
 from homeassistant.const import (
     ATTR_TEMPERATURE,
     ATTR_UNIT_OF_MEASUREMENT,
@@ -26,8 +30,14 @@ from homeassistant.const import (
     CONF_MAC,
     CONF_NAME,
     CONF_PORT,
+    EVENT_HOMEASSISTANT_STOP,
 )
+from homeassistant.core import CoreState
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.restore_state import ExtraStoredData, RestoredExtraData, RestoreEntity
+from homeassistant.util import dt as dt_util
 
 # Local imports
 from .const import (
@@ -40,17 +50,30 @@ from .const import (
     MIN_TEMP_F,
     MAX_TEMP_C,
     MAX_TEMP_F,
-    MODES_MAPPING,
     TEMSEN_OFFSET,
+    DEFAULT_STATUS_CHUNK_SIZE,
+    STATUS_CHUNK_SIZES,
+    STATUS_CHUNK_SHRINK_AFTER,
+    STATUS_CHUNK_GROW_AFTER,
     CONF_HVAC_MODES,
     CONF_ENCRYPTION_KEY,
     CONF_UID,
     CONF_ENCRYPTION_VERSION,
     CONF_DISABLE_AVAILABLE_CHECK,
     CONF_TEMP_SENSOR_OFFSET,
+    CONF_RELAY,
+    CONF_RELAY_SECRET,
+    CONF_TELEMETRY_EXPORT,
 )
-from .gree_protocol import Pad, FetchResult, GetDeviceKey, GetGCMCipher, EncryptGCM, GetDeviceKeyGCM
-from .helpers import TempOffsetResolver, gree_f_to_c, gree_c_to_f, encode_temp_c, decode_temp_c
+from .capture import CaptureWriter
+from .columns import CAPABILITY_COLUMNS, COLUMNS_BY_NAME, POLL_COLUMNS, WRITABLE_COLUMNS, ColumnPlan, GreeState, decode_columns, plan_for, registry_order
+from .discovery import async_get_discovery_index
+from .export import TelemetryExporter
+from .gree_protocol import Pad, FetchResult, ProbeDevice, ScanDevice, set_relay, start_capture, stop_capture, GetDeviceKey, GetGCMCipher, EncryptGCM, GetDeviceKeyGCM
+from .ratelimit import PRIORITY_COMMAND, PacketDropped, async_get_startup_gate
+from .storage import GreeDeviceStore
+from .telemetry import TelemetryBuffer
+from .helpers import IncrementalRegression, RuntimeCounters, TempOffsetResolver, gree_f_to_c, gree_c_to_f, encode_temp_c, decode_temp_c
 
 REQUIREMENTS = ["pycryptodome"]
 
@@ -58,15 +81,19 @@ _LOGGER = logging.getLogger(__name__)
 
 SUPPORT_FLAGS = ClimateEntityFeature.TARGET_TEMPERATURE | ClimateEntityFeature.TURN_ON | ClimateEntityFeature.TURN_OFF | ClimateEntityFeature.PRESET_MODE
 
-async def create_gree_device(hass, config):
+def _hvac_modes_from_config(config):
+    chm = config.get(CONF_HVAC_MODES)
+    return [getattr(HVACMode, mode.upper()) for mode in (chm if chm is not None else DEFAULT_HVAC_MODES)]
+
+
+async def create_gree_device(hass, config, entry_id=None):
     """Create a Gree device instance from config."""
     name = config.get(CONF_NAME, "Gree Climate")
     ip_addr = config.get(CONF_HOST)
     port = config.get(CONF_PORT, DEFAULT_PORT)
     mac_addr = config.get(CONF_MAC).encode().replace(b":", b"")
 
-    chm = config.get(CONF_HVAC_MODES)
-    hvac_modes = [getattr(HVACMode, mode.upper()) for mode in (chm if chm is not None else DEFAULT_HVAC_MODES)]
+    hvac_modes = _hvac_modes_from_config(config)
 
     #cfm = config.get(CONF_FAN_MODES)
     #fan_modes = cfm if cfm is not None else DEFAULT_FAN_MODES
@@ -79,6 +106,9 @@ async def create_gree_device(hass, config):
     encryption_version = config.get(CONF_ENCRYPTION_VERSION, 1)
     disable_available_check = config.get(CONF_DISABLE_AVAILABLE_CHECK, False)
     temp_sensor_offset = config.get(CONF_TEMP_SENSOR_OFFSET)
+    relay = config.get(CONF_RELAY)
+    relay_secret = config.get(CONF_RELAY_SECRET)
+    telemetry_export = config.get(CONF_TELEMETRY_EXPORT)
 
     return GreeClimate(
         hass,
@@ -95,6 +125,10 @@ async def create_gree_device(hass, config):
         encryption_key,
         uid,
         temp_sensor_offset,
+        entry_id,
+        relay,
+        telemetry_export,
+        relay_secret,
     )
 
 
@@ -102,6 +136,32 @@ async def create_gree_device(hass, config):
 
 # update() interval
 SCAN_INTERVAL = timedelta(seconds=60)
+# A running capture is written to disk this often, and when it stops
+CAPTURE_FLUSH_INTERVAL = timedelta(seconds=10)
+
+# Look a device up again by MAC after this many consecutive failed polls (or probes/binds while unbound),
+# at most once per interval
+REDISCOVERY_AFTER_FAILURES = 3
+REDISCOVERY_INTERVAL = 600
+REDISCOVERY_TIMEOUT = 3
+# A scan this recent is reused instead of sending another broadcast
+REDISCOVERY_SCAN_MAX_AGE = timedelta(minutes=1)
+
+# Number of protocol exchanges kept for diagnostics
+EXCHANGE_HISTORY = 50
+
+# Recorder history used to calibrate an undecided OutEnvTem offset
+TEMP_OFFSET_HISTORY = timedelta(days=1)
+
+# Per-sample discount of the heat-up rate fit (~20 polls of memory at the default interval)
+HEATING_RATE_DECAY = 0.95
+# Below this rate (°C/min) the tank is not considered to be heating up
+MIN_HEATING_RATE = 0.005
+
+# Runtime counters: polls further apart than this are not credited (seconds);
+# they are saved on every Pow/Mod transition and at least this often while the mode holds
+RUNTIME_MAX_GAP = 3 * SCAN_INTERVAL.total_seconds()
+RUNTIME_SAVE_INTERVAL = 300
 
 
 async def async_setup_entry(hass, entry, async_add_devices):
@@ -118,7 +178,7 @@ async def async_unload_entry(hass, entry):
     return True
 
 
-class GreeClimate(ClimateEntity):
+class GreeClimate(ClimateEntity, RestoreEntity):
     # Language is retrieved from translation key
     _attr_translation_key = "gree"
 
@@ -135,13 +195,25 @@ class GreeClimate(ClimateEntity):
         encryption_key=None,
         uid=None,
         temp_sensor_offset=None,
+        entry_id=None,
+        relay=None,
+        telemetry_export=None,
+        relay_secret=None,
     ):
         _LOGGER.info(f"{name}: Initializing Gree climate device")
 
         self.hass = hass
+        self._entry_id = entry_id
         self._name = name
         self._ip_addr = ip_addr
         self._port = port
+        # Requests go through a relay process (see relay.py) when set, direct UDP otherwise
+        self._relay = relay
+        self._relay_secret = relay_secret
+        # File format of the optional poll result export (see export.py), None when disabled
+        self._telemetry_export = telemetry_export
+        self._exporter = None
+        self._exporter_stop_unsub = None
         mac_addr_str = mac_addr.decode("utf-8").lower()
         if "@" in mac_addr_str:
             self._sub_mac_addr, self._mac_addr = mac_addr_str.split("@", 1)
@@ -159,7 +231,8 @@ class GreeClimate(ClimateEntity):
         _LOGGER.info(f"{self._name}: Unit of measurement: {self._unit_of_measurement}")
 
         self._hvac_modes = hvac_modes
-        self._hvac_mode = HVACMode.OFF
+        # Unknown until the first refresh
+        self._hvac_mode = None
         self._heating_temperature = None
 
         self._temp_sensor_offset = temp_sensor_offset
@@ -170,10 +243,54 @@ class GreeClimate(ClimateEntity):
         # Keep unsub callbacks for deregistering listeners
         self._listeners: list = []
 
+        # Optional hardware, None until probed or restored from storage
         self._has_temp_sensor = None
         self._has_outside_temp_sensor = None
+        self._has_room_humidity_sensor = None
+        self._has_light_sensor = None
+        self._has_anti_direct_blow = None
+        self._has_water_inlet_sensor = None
+        self._has_water_outlet_sensor = None
+        self._firmware_version = None
+        self._model = None
+        self._status_chunk_size = DEFAULT_STATUS_CHUNK_SIZE
+        # Evidence for the chunk size: consecutive size-related failures of one request length,
+        # successes at the current size, and the size to go back to if a larger one fails
+        self._chunk_failures = 0
+        self._chunk_failure_length = None
+        self._chunk_successes = 0
+        self._chunk_trial_from = None
+        self._store = GreeDeviceStore(hass, self._sub_mac_addr)
+
         self._current_temperature = None
+        self._current_outside_temperature = None
+        self._outside_temperature_c = None
+
+        # Recent numeric samples, kept in memory for derived sensors and services
+        self._telemetry = TelemetryBuffer()
+
+        # Tank heat-up rate, fitted incrementally and restarted on Pow/Mod changes
+        self._heating_rate = IncrementalRegression(decay=HEATING_RATE_DECAY)
+        self._runtime = RuntimeCounters(max_gap=RUNTIME_MAX_GAP)
+        self._runtime_saved = None
+        self._heating_rate_mode = None
         self._firstTimeRun = True
+        self._update_lock = asyncio.Lock()
+        self._refresh_task = None
+        # True while showing restored values that were not confirmed by the device yet
+        self._stale = False
+        self._last_sync = None
+        self._last_sync_error = None
+        # Consecutive failed status requests, used to look the device up again by MAC
+        self._failed_syncs = 0
+        self._last_rediscovery = None
+
+        # Last protocol exchanges with the device, for diagnostics
+        self._exchanges = deque(maxlen=EXCHANGE_HISTORY)
+        self._capture = None
+        self._capture_unsub = None
+        self._capture_flush_unsub = None
+        self._capture_stop_unsub = None
 
         self._enable_turn_on_off_backwards_compatibility = False
 
@@ -196,14 +313,11 @@ class GreeClimate(ClimateEntity):
         else:
             self._uid = 0
 
-        self._acOptions = {
-            "Pow": None,
-            "Mod": None,
-            "WatBoxTemSet": None,
-            "WatBoxTemHi": None,
-            "WatBoxTemLo": None,
-        }
-        self._optionsToFetch = ["Pow", "Mod", "WatBoxTemSet", "HeWatOutTemSet", "WatBoxTemHi","WatBoxTemLo"]
+        self._acOptions = GreeState()
+        # Columns wanted by each registered entity, keyed by unique id
+        self._column_consumers: dict[str, tuple[str, ...]] = {}
+        self._wanted_columns: set[str] = set()
+        self._fetch_plan = plan_for(())
 
         # Initialize auto switches
 
@@ -213,7 +327,310 @@ class GreeClimate(ClimateEntity):
         # helper method to determine TemSen offset
         self._process_temp_sensor = TempOffsetResolver()
 
+    def apply_options(self, config):
+        """Apply changed options to the running device."""
+        self._hvac_modes = _hvac_modes_from_config(config)
+        self._disable_available_check = config.get(CONF_DISABLE_AVAILABLE_CHECK, False)
+        self._temp_sensor_offset = config.get(CONF_TEMP_SENSOR_OFFSET)
+        if config.get(CONF_HOST, self._ip_addr) != self._ip_addr:
+            self._update_host(config[CONF_HOST])
+        _LOGGER.info(f"{self._name}: Options applied (hvac_modes={self._hvac_modes}, disable_available_check={self._disable_available_check}, temp_sensor_offset={self._temp_sensor_offset})")
+
+        if self._has_outside_temp_sensor and self._acOptions.get("OutEnvTem") is not None:
+            self.UpdateHAOutsideTemperature()
+        if self.entity_id is not None:
+            self.async_write_ha_state()
+
+    def register_columns(self, consumer_id, columns):
+        """Register the columns an entity needs in the status request."""
+        self._column_consumers[consumer_id] = tuple(columns)
+        self._update_fetch_plan()
+
+    def unregister_columns(self, consumer_id):
+        """Drop the columns of an entity that was removed or disabled."""
+        if self._column_consumers.pop(consumer_id, None) is not None:
+            self._update_fetch_plan()
+
+    def _column_supported(self, name):
+        column = COLUMNS_BY_NAME.get(name)
+        if column is None or column.capability is None:
+            return True
+        return getattr(self, column.capability) is True
+
+    def _update_fetch_plan(self):
+        wanted = set()
+        for columns in self._column_consumers.values():
+            wanted.update(columns)
+        self._wanted_columns = wanted
+        self._fetch_plan = plan_for(registry_order(name for name in wanted if self._column_supported(name)))
+        _LOGGER.debug(f"{self._name}: Status request columns: {', '.join(self._fetch_plan.names)}")
+
+    async def _async_restore_capabilities(self):
+        """Reuse probed capabilities from storage unless the firmware changed."""
+        try:
+            info = await ScanDevice(self._ip_addr, self._port, trace=self._new_trace("scan"))
+        except PacketDropped:
+            info = None  # firmware unknown this time, the stored capabilities are kept
+        if info:
+            self._firmware_version = info.get("ver")
+            self._model = info.get("model")
+        self._restore_status_chunk_size()
+
+        stored = self._store.get("capabilities")
+        if not stored:
+            return
+        if self._firmware_version is not None and stored.get("ver") != self._firmware_version:
+            _LOGGER.info(f"{self._name}: Firmware changed from {stored.get('ver')} to {self._firmware_version}, probing capabilities again")
+            return
+        for capability, supported in stored.get("columns", {}).items():
+            if capability in CAPABILITY_COLUMNS and getattr(self, capability) is None:
+                setattr(self, capability, supported)
+        _LOGGER.debug(f"{self._name}: Restored capabilities for firmware {stored.get('ver')}: {stored.get('columns')}")
+        self._update_fetch_plan()
+
+    def _restore_status_chunk_size(self):
+        """Use the chunk size learned for this model, or the configured one."""
+        stored = self._store.get("status_chunk")
+        if stored and stored.get("model") == self._model:
+            self._status_chunk_size = stored["size"]
+        else:
+            self._status_chunk_size = STATUS_CHUNK_SIZES.get(self._model, DEFAULT_STATUS_CHUNK_SIZE)
+        _LOGGER.debug(f"{self._name}: At most {self._status_chunk_size} columns per status request (model {self._model})")
+
+    async def _async_restore_temp_offset(self):
+        """Restore the OutEnvTem offset decision, or calibrate it from recorder history."""
+        if self._temp_sensor_offset is not None:
+            return
+        stored = self._store.get("temp_offset")
+        if stored:
+            self._process_temp_sensor.restore(stored)
+            _LOGGER.debug(f"{self._name}: Restored temperature offset resolver: {stored}")
+            return
+        if "recorder" not in self.hass.config.components:
+            return
+
+        from homeassistant.components.recorder import get_instance, history
+        from homeassistant.helpers import entity_registry as er
+        from homeassistant.util import dt as dt_util
+
+        entity_id = er.async_get(self.hass).async_get_entity_id("sensor", DOMAIN, f"{self._mac_addr}_outside_temperature")
+        if entity_id is None:
+            return
+        try:
+            states = await get_instance(self.hass).async_add_executor_job(
+                partial(
+                    history.state_changes_during_period,
+                    self.hass,
+                    dt_util.utcnow() - TEMP_OFFSET_HISTORY,
+                    entity_id=entity_id,
+                    no_attributes=True,
+                )
+            )
+        except Exception as e:
+            _LOGGER.debug(f"{self._name}: Could not read outside temperature history: {e}")
+            return
+
+        values = []
+        for state in states.get(entity_id, []):
+            try:
+                values.append(float(state.state))
+            except ValueError:
+                continue
+        if self._unit_of_measurement == "°F":
+            values = [(value - 32.0) * 5.0 / 9.0 for value in values]
+        if self._process_temp_sensor.calibrate(values):
+            _LOGGER.debug(f"{self._name}: Calibrated temperature offset resolver from {len(values)} recorded readings")
+
+    def _save_capabilities(self):
+        columns = {capability: getattr(self, capability) for capability in CAPABILITY_COLUMNS if getattr(self, capability) is not None}
+        self._store.set("capabilities", {"ver": self._firmware_version, "columns": columns})
+
+    def _check_capability_columns(self, plan, values):
+        """Forget a capability whose column stopped returning a value, so it is probed again."""
+        failed = [
+            column.capability
+            for name, value in zip(plan.names, values)
+            if value in ("", None) and (column := COLUMNS_BY_NAME.get(name)) is not None and column.capability
+        ]
+        if failed:
+            for capability in failed:
+                _LOGGER.info(f"{self._name}: Column {CAPABILITY_COLUMNS[capability]} stopped answering, probing it again")
+                setattr(self, capability, None)
+            self._update_fetch_plan()
+            self._save_capabilities()
+
+    async def async_start_capture(self, path, duration):
+        """Record the raw datagrams exchanged with the device for `duration` seconds."""
+        await self.async_stop_capture()
+        writer = await self.hass.async_add_executor_job(CaptureWriter, path)
+        start_capture(self._ip_addr, self._port, self._unique_id, writer)
+        self._capture = writer
+        self._capture_unsub = async_call_later(self.hass, duration, self._async_capture_expired)
+        self._capture_flush_unsub = async_track_time_interval(self.hass, self._async_flush_capture, CAPTURE_FLUSH_INTERVAL)
+        self._capture_stop_unsub = self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_capture_on_stop)
+        _LOGGER.info(f"{self._name}: Recording protocol exchanges to {path} for {duration}s")
+
+    async def _async_flush_capture(self, _now=None):
+        if self._capture is not None:
+            await self.hass.async_add_executor_job(self._capture.flush)
+
+    async def _async_capture_expired(self, _now):
+        self._capture_unsub = None
+        await self.async_stop_capture()
+
+    async def _async_capture_on_stop(self, _event):
+        self._capture_stop_unsub = None
+        await self.async_stop_capture()
+
+    async def async_stop_capture(self):
+        """Stop recording and write out the capture file, returning its path."""
+        for attr in ("_capture_unsub", "_capture_flush_unsub", "_capture_stop_unsub"):
+            unsub = getattr(self, attr)
+            if unsub is not None:
+                unsub()
+                setattr(self, attr, None)
+        writer = self._capture
+        if writer is None:
+            return None
+        self._capture = None
+        stop_capture(self._ip_addr, self._port, self._unique_id)
+        await self.hass.async_add_executor_job(writer.close)
+        _LOGGER.info(f"{self._name}: Recorded {writer.records} datagrams to {writer.path}")
+        return writer.path
+
+    async def _async_fetch_state(self, plan):
+        """Fetch the status columns, looking the device up by MAC after repeated timeouts."""
+        try:
+            # While offline, do not spend the full request and retry ladder on a device that does not answer
+            if self._device_online is False and not await ProbeDevice(self._ip_addr, self._port, trace=self._new_trace("probe")):
+                raise TimeoutError(f"No answer to liveness probe from {self._ip_addr}:{self._port}")
+            values = await self.GreeGetValues(plan.names)
+        except PacketDropped:
+            raise  # shed by the packet budget, not a sign the device is gone
+        except Exception:
+            self._failed_syncs += 1
+            if not await self._async_rediscover():
+                raise
+            # Found at a new address: resume right away
+            values = await self.GreeGetValues(plan.names)
+        self._failed_syncs = 0
+        return values
+
+    async def _async_rediscover(self):
+        """Look this device's MAC up on the network; return True if it moved to a new IP."""
+        if self._failed_syncs < REDISCOVERY_AFTER_FAILURES:
+            return False
+        index = async_get_discovery_index(self.hass)
+        known = index.get(self._mac_addr)
+        if known is not None and known.host != self._ip_addr:
+            # Already seen at another address by the background scan
+            self._update_host(known.host)
+            return True
+
+        now = time.monotonic()
+        if self._last_rediscovery is not None and now - self._last_rediscovery < REDISCOVERY_INTERVAL:
+            return False
+        self._last_rediscovery = now
+
+        if index.is_fresh(REDISCOVERY_SCAN_MAX_AGE):
+            # Another device that stopped answering (e.g. after a DHCP renumbering) just scanned
+            _LOGGER.debug(f"{self._name}: MAC {self._mac_addr} not in the discovery scan that just ran")
+            return False
+        _LOGGER.info(f"{self._name}: No answer from {self._ip_addr} after {self._failed_syncs} polls, scanning for MAC {self._mac_addr}")
+        # Non-blocking broadcast, see discover_gree_devices
+        await index.async_scan(timeout=REDISCOVERY_TIMEOUT)
+        known = index.get(self._mac_addr)
+        if known is None or known.host == self._ip_addr:
+            _LOGGER.debug(f"{self._name}: MAC {self._mac_addr} not found at a new address")
+            return False
+        self._update_host(known.host)
+        return True
+
+    def _update_host(self, host):
+        """Switch to a new IP address and store it in the config entry."""
+        _LOGGER.warning(f"{self._name}: Device moved from {self._ip_addr} to {host}")
+        writer = stop_capture(self._ip_addr, self._port, self._unique_id)
+        if writer is not None:
+            start_capture(host, self._port, self._unique_id, writer)
+        set_relay(self._ip_addr, self._port, self._unique_id, None)
+        set_relay(host, self._port, self._unique_id, self._relay, self._relay_secret)
+        self._ip_addr = host
+        entry = self.hass.config_entries.async_get_entry(self._entry_id) if self._entry_id else None
+        if entry is not None and entry.data.get(CONF_HOST) != host:
+            self.hass.config_entries.async_update_entry(entry, data={**entry.data, CONF_HOST: host})
+
+    def _new_trace(self, request_type, cols=None):
+        """Start recording a protocol exchange for diagnostics."""
+        trace = {"time": dt_util.utcnow().isoformat(), "type": request_type}
+        if cols is not None:
+            trace["cols"] = list(cols)
+        self._exchanges.append(trace)
+        return trace
+
     async def GreeGetValues(self, propertyNames):
+        """Read columns in status requests of at most `_status_chunk_size` columns, merging the dat lists."""
+        names = list(propertyNames)
+        values = []
+        while len(values) < len(names):
+            chunk = names[len(values):len(values) + self._status_chunk_size]
+            values.extend(await self._async_get_chunk(chunk))
+        return values
+
+    async def _async_get_chunk(self, names):
+        try:
+            values = await self._async_status_request(names)
+        except PacketDropped:
+            raise  # shed by the packet budget, says nothing about the reply size
+        except Exception:
+            # A unit that answers a scan but not the status request may have dropped a reply that was too long
+            if len(names) < 2 or not await ProbeDevice(self._ip_addr, self._port, trace=self._new_trace("probe")):
+                raise
+            # Serve this request in halves; only the stored size waits for more evidence
+            size = len(names) // 2
+            values = await self._async_get_chunk(names[:size])
+            values.extend(await self._async_get_chunk(names[size:]))
+            self._status_chunk_failed(len(names))
+            return values
+        self._status_chunk_succeeded(len(names))
+        return values
+
+    def _status_chunk_failed(self, length):
+        """Record a request of `length` columns that failed while its halves worked."""
+        if self._chunk_trial_from is not None and length <= self._status_chunk_size:
+            # The larger size tried after a run of successes does not work, go back right away
+            self._set_status_chunk_size(self._chunk_trial_from)
+            self._chunk_trial_from = None
+            return
+        if length == self._chunk_failure_length:
+            self._chunk_failures += 1
+        else:
+            self._chunk_failure_length = length
+            self._chunk_failures = 1
+        self._chunk_successes = 0
+        if self._chunk_failures >= STATUS_CHUNK_SHRINK_AFTER:
+            _LOGGER.info(f"{self._name}: Status requests of {length} columns failed {self._chunk_failures} times while smaller ones worked")
+            self._set_status_chunk_size(min(self._status_chunk_size, length // 2))
+
+    def _status_chunk_succeeded(self, length):
+        if length < self._status_chunk_size:
+            return  # says nothing about the limit
+        self._chunk_trial_from = None
+        self._chunk_failures = 0
+        self._chunk_successes += 1
+        limit = STATUS_CHUNK_SIZES.get(self._model, DEFAULT_STATUS_CHUNK_SIZE)
+        if self._chunk_successes >= STATUS_CHUNK_GROW_AFTER and self._status_chunk_size < limit:
+            self._chunk_trial_from = self._status_chunk_size
+            self._set_status_chunk_size(min(limit, self._status_chunk_size * 2))
+
+    def _set_status_chunk_size(self, size):
+        _LOGGER.info(f"{self._name}: Using status requests of at most {size} columns (was {self._status_chunk_size})")
+        self._status_chunk_size = size
+        self._chunk_failures = 0
+        self._chunk_failure_length = None
+        self._chunk_successes = 0
+        self._store.set("status_chunk", {"model": self._model, "size": size})
+
+    async def _async_status_request(self, propertyNames):
         plaintext = '{"cols":' + simplejson.dumps(propertyNames) + ',"mac":"' + str(self._sub_mac_addr) + '","t":"status"}'
         if self.encryption_version == 1:
             cipher = self.CIPHER
@@ -222,40 +639,40 @@ class GreeClimate(ClimateEntity):
             pack, tag = EncryptGCM(self._encryption_key, plaintext)
             jsonPayloadToSend = '{"cid":"app","i":0,"pack":"' + pack + '","t":"pack","tcid":"' + str(self._mac_addr) + '","uid":{}'.format(self._uid) + ',"tag" : "' + tag + '"}'
             cipher = GetGCMCipher(self._encryption_key)
-        result = await FetchResult(cipher, self._ip_addr, self._port, jsonPayloadToSend, encryption_version=self.encryption_version)
-        return result["dat"][0] if len(result["dat"]) == 1 else result["dat"]
+        result = await FetchResult(cipher, self._ip_addr, self._port, jsonPayloadToSend, encryption_version=self.encryption_version, trace=self._new_trace("status", propertyNames))
+        # Always a list, aligned with propertyNames
+        if len(result.get("dat", ())) != len(propertyNames):
+            raise ValueError(f"Status reply holds {len(result.get('dat', ()))} of {len(propertyNames)} columns")
+        return result["dat"]
 
     def SetAcOptions(self, acOptions, newOptionsToOverride, optionValuesToOverride=None):
         if optionValuesToOverride is not None:
-            # Build a list of key-value pairs for a single log line
-            settings = []
-            for key in newOptionsToOverride:
-                value = optionValuesToOverride[newOptionsToOverride.index(key)]
-                settings.append(f"{key}={value}")
-                acOptions[key] = value
-            _LOGGER.debug(f"{self._name}: Setting device options with retrieved values: {', '.join(settings)}")
+            # newOptionsToOverride is a ColumnPlan or a list of column names aligned with the values
+            plan = newOptionsToOverride if isinstance(newOptionsToOverride, ColumnPlan) else plan_for(newOptionsToOverride)
+            acOptions.apply(plan, optionValuesToOverride)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                settings = ", ".join(f"{key}={value}" for key, value in zip(plan.names, optionValuesToOverride))
+                _LOGGER.debug(f"{self._name}: Setting device options with retrieved values: {settings}")
         else:
-            # Build a list of key-value pairs for a single log line
-            settings = []
-            for key, value in newOptionsToOverride.items():
-                settings.append(f"{key}={value}")
-                acOptions[key] = value
-            _LOGGER.debug(f"{self._name}: Overwriting device options with new settings: {', '.join(settings)}")
+            acOptions.update(newOptionsToOverride)
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                settings = ", ".join(f"{key}={value}" for key, value in newOptionsToOverride.items())
+                _LOGGER.debug(f"{self._name}: Overwriting device options with new settings: {settings}")
         return acOptions
 
-    async def SendStateToAc(self):
-        opt_list = ["Pow", "Mod", "WatBoxTemSet", "HeWatOutTemSet"]
-
-        # Collect values from _acOptions
-        p_values = [self._acOptions.get(k) for k in opt_list]
-
-        # Filter out empty ones
+    async def SendStateToAc(self, columns=None):
+        # Collect the writable values known in _acOptions (or only the given columns), skipping empty ones
+        sent_columns = []
         filtered_opt = []
         filtered_p = []
-        for name, val in zip(opt_list, p_values):
+        for name in (WRITABLE_COLUMNS if columns is None else columns):
+            val = self._acOptions.get(name)
             if val not in ("", None):
+                column = COLUMNS_BY_NAME.get(name)
+                encode = column.encode if column is not None else None
+                sent_columns.append(name)
                 filtered_opt.append(f'"{name}"')
-                filtered_p.append(str(val))
+                filtered_p.append(str(encode(val) if encode else val))
 
         statePackJson = '{"opt":[' + ",".join(filtered_opt) + '],"p":[' + ",".join(filtered_p) + '],"t":"cmd","sub":"' + self._sub_mac_addr + '"}'
 
@@ -266,8 +683,72 @@ class GreeClimate(ClimateEntity):
             pack, tag = EncryptGCM(self._encryption_key, statePackJson)
             sentJsonPayload = '{"cid":"app","i":0,"pack":"' + pack + '","t":"pack","tcid":"' + str(self._mac_addr) + '","uid":{}'.format(self._uid) + ',"tag":"' + tag + '"}'
             cipher = GetGCMCipher(self._encryption_key)
-        result = await FetchResult(cipher, self._ip_addr, self._port, sentJsonPayload, encryption_version=self.encryption_version)
+        trace = self._new_trace("cmd", sent_columns)
+        result = await FetchResult(cipher, self._ip_addr, self._port, sentJsonPayload, encryption_version=self.encryption_version, trace=trace, priority=PRIORITY_COMMAND)
         _LOGGER.debug(f"{self._name}: Command sent successfully: {str(result)}")
+        await self._async_apply_command_result(sent_columns, result)
+        return result
+
+    async def _async_apply_command_result(self, columns, result):
+        """Apply the values acknowledged in a cmd reply and re-read the columns it did not confirm."""
+        acknowledged = {}
+        if result.get("r", 200) == 200:
+            # "val" holds the values the device applied, older firmware only echoes "p"
+            values = result.get("val") if result.get("val") is not None else result.get("p", [])
+            acknowledged = dict(zip(result.get("opt", []), values))
+            if acknowledged:
+                self._acOptions = self.SetAcOptions(self._acOptions, list(acknowledged), list(acknowledged.values()))
+        else:
+            _LOGGER.warning(f"{self._name}: Device rejected command with code {result.get('r')}")
+
+        unconfirmed = [name for name in columns if name not in acknowledged]
+        if not unconfirmed:
+            return
+        _LOGGER.debug(f"{self._name}: Command not confirmed for {', '.join(unconfirmed)}, reading them back")
+        try:
+            values = await self.GreeGetValues(unconfirmed)
+        except Exception as e:
+            _LOGGER.warning(f"{self._name}: Failed to read back {', '.join(unconfirmed)}: {str(e)}")
+        else:
+            self._acOptions = self.SetAcOptions(self._acOptions, unconfirmed, values)
+
+    async def async_read_columns(self, names):
+        """Read any columns in a single status request, without touching the entity state.
+
+        Returns the raw values and their decoding through the column registry.
+        The request is not split into chunks and does not affect the learned
+        chunk size; a column set too long for the module simply fails.
+        """
+        if not self._encryption_key:
+            raise HomeAssistantError(f"{self._name} is not bound yet")
+        values = await self._async_status_request(list(names))
+        raw = dict(zip(names, values))
+        return {"raw": raw, "decoded": decode_columns(raw)}
+
+    async def async_send_command(self, values):
+        """Send only the given columns in a single cmd, without fetching the state first."""
+        if not self._encryption_key:
+            raise HomeAssistantError(f"{self._name} is not bound yet")
+        # SendStateToAc sends from _acOptions; the reply overwrites these with what the device applied
+        previous = {name: self._acOptions[name] for name in values if name in self._acOptions}
+        self._acOptions = self.SetAcOptions(self._acOptions, values)
+        try:
+            result = await self.SendStateToAc(list(values))
+        except Exception as e:
+            # The device never accepted the values, keep showing the old ones
+            for name in values:
+                if name in previous:
+                    self._acOptions[name] = previous[name]
+                else:
+                    self._acOptions.discard(name)
+            if not self._disable_available_check and not isinstance(e, PacketDropped):
+                _LOGGER.info(f"{self._name}: Device marked offline after failed send attempt")
+                self._device_online = False
+            raise
+        if self._last_sync is not None:
+            self.UpdateHAStateToCurrentACState()
+        self.async_write_ha_state()
+        return result
 
     def UpdateHATargetTemperature(self):
 
@@ -307,11 +788,19 @@ class GreeClimate(ClimateEntity):
         if self._acOptions["Pow"] == 0:
             self._hvac_mode = HVACMode.OFF
         else:
-            for key, value in MODES_MAPPING.get("Mod").items():
+            for key, value in COLUMNS_BY_NAME["Mod"].values.items():
                 if value == (self._acOptions["Mod"]):
                     self._hvac_mode = key
         _LOGGER.debug(f"{self._name}: HVAC mode updated to {self._hvac_mode}")
 
+        # Count operating time and starts from the observed transitions, once the stored totals are loaded
+        if self._store.loaded:
+            now = time.monotonic()
+            changed = self._runtime.observe(None if self._hvac_mode == HVACMode.OFF else self._hvac_mode, now)
+            if changed or self._runtime_saved is None or now - self._runtime_saved >= RUNTIME_SAVE_INTERVAL:
+                self._runtime_saved = now
+                self._store.set("runtime", self._runtime.as_dict())
+
     def UpdateHACurrentTemperature(self):
         # Use external temperature sensor if available
         if self._external_temperature_sensor:
@@ -329,10 +818,10 @@ class GreeClimate(ClimateEntity):
 
         # Use built-in AC temperature sensor if available
         if self._has_temp_sensor:
-            _LOGGER.debug(f"{self._name}: Built-in temperature sensor reading: {(self._acOptions["WatBoxTemHi"] - 100) + (self._acOptions["WatBoxTemLo"]/10)}")
-
-
-            temp_c = (self._acOptions["WatBoxTemHi"] - 100) + (self._acOptions["WatBoxTemLo"]/10)
+            temp_c = self._acOptions.derived("tank_temperature")
+            if temp_c is None:
+                return
+            _LOGGER.debug(f"{self._name}: Built-in temperature sensor reading: {temp_c}")
 
             temp_f = gree_c_to_f(SetTem=temp_c, TemRec=0)  # Convert to Fahrenheit using TemRec bit
 
@@ -345,6 +834,16 @@ class GreeClimate(ClimateEntity):
 
             _LOGGER.debug(f"{self._name}: UpdateHACurrentTemperature: HA current temperature set with device built-in temperature sensor state: {self._current_temperature}{self._unit_of_measurement}")
 
+    def _update_heating_rate(self, temp_c):
+        if temp_c is None:
+            return
+        mode = (self._acOptions.get("Pow"), self._acOptions.get("Mod"))
+        if mode != self._heating_rate_mode:
+            _LOGGER.debug(f"{self._name}: Pow/Mod changed to {mode}, restarting heat-up rate estimate")
+            self._heating_rate.reset()
+            self._heating_rate_mode = mode
+        self._heating_rate.add(time.monotonic(), temp_c)
+
     def UpdateHAOutsideTemperature(self):
         # Update outside temperature from built-in AC outside temperature sensor if available
         if self._has_outside_temp_sensor:
@@ -353,6 +852,9 @@ class GreeClimate(ClimateEntity):
             if self._temp_sensor_offset is None:  # user hasn't chosen an offset
                 # User hasn't set automatically, so try to determine the offset
                 temp_c = self._process_temp_sensor(self._acOptions["OutEnvTem"])
+                resolver_state = self._process_temp_sensor.as_dict()
+                if resolver_state != self._store.get("temp_offset"):
+                    self._store.set("temp_offset", resolver_state)
                 _LOGGER.debug("method UpdateHAOutsideTemperature: User has not chosen an offset, using process_temp_sensor() to automatically determine offset.")
             else:
                 # User set
@@ -363,6 +865,7 @@ class GreeClimate(ClimateEntity):
 
                 _LOGGER.debug(f"method UpdateHAOutsideTemperature: User has chosen an offset ({self._temp_sensor_offset})")
 
+            self._outside_temperature_c = temp_c
             temp_f = gree_c_to_f(SetTem=temp_c, TemRec=0)  # Convert to Fahrenheit using TemRec bit
 
             if self._unit_of_measurement == "°C":
@@ -381,56 +884,77 @@ class GreeClimate(ClimateEntity):
         self.UpdateHAOutsideTemperature()
         self.UpdateHAHeatingTemperature()
 
+    def _record_telemetry(self):
+        state = self._acOptions
+        self._telemetry.append(
+            time.time(),
+            {
+                "tank_temperature": state.derived("tank_temperature") if self._has_temp_sensor else None,
+                "outside_temperature": self._outside_temperature_c if self._has_outside_temp_sensor else None,
+                "WatBoxTemSet": state.get("WatBoxTemSet"),
+                "HeWatOutTemSet": state.get("HeWatOutTemSet"),
+                "Pow": state.get("Pow"),
+                "Mod": state.get("Mod"),
+            },
+        )
+
+    @property
+    def telemetry(self) -> TelemetryBuffer:
+        """Return the in-memory sample history of this device."""
+        return self._telemetry
+
     async def SyncState(self, acOptions={}):
         # Fetch current settings from HVAC
         _LOGGER.debug(f"{self._name}: Starting device state sync")
 
-        if self._has_temp_sensor is None:
-            _LOGGER.debug("Attempt to check whether device has an built-in temperature sensor")
+        # Probe optional columns that an entity wants but whose support is still unknown
+        probed = False
+        for capability, column in CAPABILITY_COLUMNS.items():
+            if column not in self._wanted_columns or getattr(self, capability) is not None:
+                continue
+            _LOGGER.debug(f"{self._name}: Attempt to check whether device supports {column}")
             try:
-                temp_sensor = await self.GreeGetValues(["WatBoxTemHi"])
+                value = await self.GreeGetValues([column])
             except Exception:
-                _LOGGER.debug("Could not determine whether device has an built-in temperature sensor. Retrying at next update()")
+                _LOGGER.debug(f"{self._name}: Could not determine whether device supports {column}. Retrying at next update()")
             else:
-                if temp_sensor:
-                    self._has_temp_sensor = True
-                    _LOGGER.debug("Device has an built-in temperature sensor")
-                else:
-                    self._has_temp_sensor = False
-                    _LOGGER.debug("Device has no built-in temperature sensor")
-
-        # Check if device has outside temperature sensor
-        if self._has_outside_temp_sensor is None:
-            _LOGGER.debug("Attempt to check whether device has an outside temperature sensor")
-            try:
-                outside_temp_sensor = await self.GreeGetValues(["OutEnvTem"])
-            except Exception:
-                _LOGGER.debug("Could not determine whether device has an outside temperature sensor. Retrying at next update()")
-            else:
-                if outside_temp_sensor:
-                    self._has_outside_temp_sensor = True
-                    self._acOptions.update({"OutEnvTem": None})
-                    self._optionsToFetch.append("OutEnvTem")
-                    _LOGGER.debug("Device has an outside temperature sensor")
-                else:
-                    self._has_outside_temp_sensor = False
-                    _LOGGER.debug("Device has no outside temperature sensor")
+                supported = bool(value and value[0])
+                setattr(self, capability, supported)
+                probed = True
+                _LOGGER.debug(f"{self._name}: Device {'supports' if supported else 'does not support'} {column}")
+        if probed:
+            self._update_fetch_plan()
+            self._save_capabilities()
+
+        if self._device_online is False and async_get_discovery_index(self.hass).is_gone(self._mac_addr):
+            _LOGGER.debug(f"{self._name}: Device missing from recent discovery scans, skipping status request")
+            return
 
-        optionsToFetch = self._optionsToFetch
+        optionsToFetch = self._fetch_plan
+        if not optionsToFetch.names:
+            _LOGGER.debug(f"{self._name}: No enabled entity needs device columns, skipping status request")
+            return
 
         try:
-            currentValues = await self.GreeGetValues(optionsToFetch)
+            currentValues = await self._async_fetch_state(optionsToFetch)
+        except PacketDropped:
+            # The integration is over its packet budget: skip this poll, the device state is unchanged
+            _LOGGER.debug(f"{self._name}: Status request shed by the packet budget, skipping this poll")
         except Exception as e:
             _LOGGER.warning(f"{self._name}: Failed to communicate with device {self._ip_addr}:{self._port}: {str(e)}")
+            self._last_sync_error = dt_util.utcnow()
             if not self._disable_available_check:
                 _LOGGER.info(f"{self._name}: Device marked offline after failed communication")
                 self._device_online = False
         else:
+            self._last_sync = dt_util.utcnow()
+            self._stale = False
             if not self._disable_available_check:
                 if not self._device_online:
                     self._device_online = True
             # Set latest status from device
             self._acOptions = self.SetAcOptions(self._acOptions, optionsToFetch, currentValues)
+            self._check_capability_columns(optionsToFetch, currentValues)
 
             # Overwrite status with our choices
             if not (acOptions == {}):
@@ -442,6 +966,8 @@ class GreeClimate(ClimateEntity):
                     # loop used to send changed settings from HA to HVAC
                     try:
                         await self.SendStateToAc()
+                    except PacketDropped:
+                        _LOGGER.warning(f"{self._name}: Command to {self._ip_addr}:{self._port} shed by the packet budget")
                     except Exception as e:
                         _LOGGER.warning(f"{self._name}: Failed to send state to device {self._ip_addr}:{self._port}: {str(e)}")
                         # Mark device as offline if communication fails
@@ -454,6 +980,12 @@ class GreeClimate(ClimateEntity):
 
             # Update HA state to current HVAC state
             self.UpdateHAStateToCurrentACState()
+            self._record_telemetry()
+            # Only fresh readings feed the heat-up rate (commands re-apply the last one), whichever sensor is shown
+            if self._has_temp_sensor:
+                self._update_heating_rate(self._acOptions.derived("tank_temperature"))
+            if self._exporter is not None:
+                self._exporter.record(self._acOptions, self._outside_temperature_c if self._has_outside_temp_sensor else None)
 
             _LOGGER.debug(f"{self._name}: Finished device state sync")
 
@@ -471,6 +1003,9 @@ class GreeClimate(ClimateEntity):
             if self._device_online:
                 _LOGGER.debug("available(): Device is online")
                 return True
+            elif self._device_online is None:
+                # Not contacted yet; the first refresh runs in the background
+                return True
             else:
                 _LOGGER.debug("available(): Device is offline")
                 return False
@@ -478,23 +1013,56 @@ class GreeClimate(ClimateEntity):
     async def async_update(self):
         """Retrieve latest state."""
         _LOGGER.debug("async_update()")
+        if self._update_lock.locked():
+            _LOGGER.debug(f"{self._name}: Update already in progress, skipping")
+            return
+        async with self._update_lock:
+            await self._async_update()
+
+    async def _async_update(self):
+        if not self._store.loaded:
+            await self._store.async_load()
+            self._runtime.restore(self._store.get("runtime", {}))
+            await self._async_restore_capabilities()
+            await self._async_restore_temp_offset()
         if not self._encryption_key:
-            if self.encryption_version == 1:
-                key = await GetDeviceKey(self._mac_addr, self._ip_addr, self._port)
-                if key:
-                    self._encryption_key = key
-                    self.CIPHER = AES.new(self._encryption_key, AES.MODE_ECB)
-                    await self.SyncState()
-            elif self.encryption_version == 2:
-                key = await GetDeviceKeyGCM(self._mac_addr, self._ip_addr, self._port)
-                if key:
-                    self._encryption_key = key
-                    self.CIPHER = GetGCMCipher(self._encryption_key)
-                    await self.SyncState()
-            else:
-                _LOGGER.error("Encryption version %s is not implemented." % self.encryption_version)
+            try:
+                bound = await self._async_bind()
+            except PacketDropped:
+                _LOGGER.debug(f"{self._name}: Binding shed by the packet budget, retrying at next update()")
+                return
+            if not bound:
+                # The unit may have a new DHCP address (e.g. renumbered while Home Assistant was down)
+                self._failed_syncs += 1
+                try:
+                    if not await self._async_rediscover() or not await self._async_bind():
+                        return
+                except PacketDropped:
+                    return
+            self._failed_syncs = 0
+        await self.SyncState()
+
+    async def _async_bind(self):
+        """Fetch the device key; return True once bound."""
+        # Binding retries for a long time, make sure the device is there first
+        if not await ProbeDevice(self._ip_addr, self._port, trace=self._new_trace("probe")):
+            _LOGGER.debug(f"{self._name}: No answer to liveness probe, postponing binding")
+            if not self._disable_available_check:
+                self._device_online = False
+            return False
+        if self.encryption_version == 1:
+            key = await GetDeviceKey(self._mac_addr, self._ip_addr, self._port, trace=self._new_trace("bind"))
+            if key:
+                self._encryption_key = key
+                self.CIPHER = AES.new(self._encryption_key, AES.MODE_ECB)
+        elif self.encryption_version == 2:
+            key = await GetDeviceKeyGCM(self._mac_addr, self._ip_addr, self._port, trace=self._new_trace("bind"))
+            if key:
+                self._encryption_key = key
+                self.CIPHER = GetGCMCipher(self._encryption_key)
         else:
-            await self.SyncState()
+            _LOGGER.error("Encryption version %s is not implemented." % self.encryption_version)
+        return bool(self._encryption_key)
 
     @property
     def name(self):
@@ -588,6 +1156,67 @@ class GreeClimate(ClimateEntity):
             return self._current_outside_temperature
         return None
 
+    @property
+    def tank_heating_rate(self):
+        """Return the tank heat-up rate in °C/min."""
+        slope = self._heating_rate.slope
+        return None if slope is None else slope * 60
+
+    @property
+    def tank_time_to_target(self):
+        """Return the estimated minutes until the tank reaches WatBoxTemSet."""
+        rate = self.tank_heating_rate
+        current = self._acOptions.derived("tank_temperature") if self._has_temp_sensor else None
+        target = self._acOptions.get("WatBoxTemSet")
+        if rate is None or current is None or target is None or self._acOptions.get("Pow") == 0:
+            return None
+        if current >= target:
+            return 0
+        if rate < MIN_HEATING_RATE:
+            return None
+        return (target - current) / rate
+
+    def runtime_hours(self, mode):
+        """Return the hours the unit ran in a Mod while powered on."""
+        return round(self._runtime.runtime.get(mode, 0.0) / 3600, 3)
+
+    @property
+    def starts(self):
+        """Return how many times the unit was seen switching on."""
+        return self._runtime.starts
+
+    @property
+    def room_humidity(self):
+        """Return the room humidity if available."""
+        if self._has_room_humidity_sensor:
+            return self._acOptions.get("DwatSen")
+        return None
+
+    def _water_temperature(self, key):
+        temp_c = self._acOptions.derived(key)
+        if temp_c is None or self._unit_of_measurement == "°C":
+            return temp_c
+        return gree_c_to_f(SetTem=temp_c, TemRec=0)
+
+    @property
+    def water_inlet_temperature(self):
+        """Return the water inlet temperature if available."""
+        if self._has_water_inlet_sensor:
+            return self._water_temperature("water_inlet_temperature")
+        return None
+
+    @property
+    def water_outlet_temperature(self):
+        """Return the water outlet temperature if available."""
+        if self._has_water_outlet_sensor:
+            return self._water_temperature("water_outlet_temperature")
+        return None
+
+    def status_column(self, name):
+        """Return the raw value of a status column, None if the device left it empty."""
+        value = self._acOptions.get(name)
+        return None if value == "" else value
+
     @property
     def heating_temperature(self):
         """Return the outside temperature if available."""
@@ -613,6 +1242,9 @@ class GreeClimate(ClimateEntity):
         """Return additional state attributes."""
         attributes = {}
 
+        if self._stale:
+            attributes["stale"] = True
+
         # if self.outside_temperature is not None:
         #     attributes["outside_temperature"] = self.outside_temperature
         #     attributes["outside_temperature_unit"] = self._unit_of_measurement
@@ -687,7 +1319,7 @@ class GreeClimate(ClimateEntity):
         if hvac_mode == HVACMode.OFF:
             c.update({"Pow": 0})
         else:
-            mod = MODES_MAPPING.get("Mod").get(hvac_mode)
+            mod = COLUMNS_BY_NAME["Mod"].values.get(hvac_mode)
             c.update({"Pow": 1, "Mod": mod})
         await self.SyncState(c)
         self.async_write_ha_state()
@@ -708,12 +1340,72 @@ class GreeClimate(ClimateEntity):
         await self.SyncState(c)
         self.async_write_ha_state()
 
+    @property
+    def extra_restore_state_data(self) -> ExtraStoredData:
+        """Store the device's column values alongside the state."""
+        return RestoredExtraData({"ac_options": self._acOptions.as_dict()})
+
+    async def _async_restore_last_state(self):
+        """Show the last known state until live data arrives."""
+        last_extra = await self.async_get_last_extra_data()
+        if last_extra is not None:
+            ac_options = last_extra.as_dict().get("ac_options")
+            if ac_options:
+                self._acOptions.update(ac_options)
+
+        last_state = await self.async_get_last_state()
+        if last_state is None or last_state.state in ("unknown", "unavailable"):
+            return
+        if last_state.state in list(HVACMode):
+            self._hvac_mode = HVACMode(last_state.state)
+        self._target_temperature = last_state.attributes.get(ATTR_TEMPERATURE)
+        self._current_temperature = last_state.attributes.get(ATTR_CURRENT_TEMPERATURE)
+        self._stale = True
+        _LOGGER.debug(f"{self._name}: Restored last state {last_state.state} (stale until the first sync)")
+
     async def async_added_to_hass(self):
         _LOGGER.info("Gree climate device added to hass()")
-        await self.async_update()
+        await super().async_added_to_hass()
+        await self._async_restore_last_state()
+        set_relay(self._ip_addr, self._port, self._unique_id, self._relay, self._relay_secret)
+        if self._telemetry_export:
+            self._exporter = TelemetryExporter(self.hass, self._sub_mac_addr, self._telemetry_export)
+            await self._exporter.async_start()
+            # Entities are not removed when Home Assistant stops, so write out the buffered rows then
+            self._exporter_stop_unsub = self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, self._async_exporter_on_stop)
+        self.register_columns(self._unique_id, POLL_COLUMNS)
+        # Do not hold up entry setup on device I/O (binding and retries can take a long time)
+        self._refresh_task = self.hass.async_create_background_task(self._async_initial_refresh(), name=f"{DOMAIN} {self._name} initial refresh")
+
+    async def _async_initial_refresh(self):
+        # Spread the bind/status requests of all devices when Home Assistant starts
+        gate = async_get_startup_gate(self.hass)
+        async with gate.admit(delay=self.hass.state is not CoreState.running):
+            await self.async_update()
+        self.async_write_ha_state()
+
+    async def _async_exporter_on_stop(self, _event):
+        self._exporter_stop_unsub = None
+        await self._async_stop_exporter()
+
+    async def _async_stop_exporter(self):
+        """Flush the buffered telemetry rows and close the export file."""
+        if self._exporter_stop_unsub is not None:
+            self._exporter_stop_unsub()
+            self._exporter_stop_unsub = None
+        exporter, self._exporter = self._exporter, None
+        if exporter is not None:
+            await exporter.async_stop()
 
     async def async_will_remove_from_hass(self) -> None:
         """Clean up when entity is removed."""
+        if self._refresh_task is not None and not self._refresh_task.done():
+            self._refresh_task.cancel()
+        self._refresh_task = None
+        await self.async_stop_capture()
+        set_relay(self._ip_addr, self._port, self._unique_id, None)
+        await self._async_stop_exporter()
+        self.unregister_columns(self._unique_id)
         for name, entity_id, unsub in self._listeners:
             _LOGGER.debug("Deregistering %s listener for %s", name, entity_id)
             unsub()
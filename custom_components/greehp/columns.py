@@ -0,0 +1,226 @@
+"""Gree column registry and compact device state record."""
+
+from __future__ import annotations
+
+# Standard library imports
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+# Local imports
+from .const import MODES_MAPPING
+
+
+@dataclass(frozen=True)
+class GreeColumn:
+    """Describes a single Gree protocol column."""
+
+    name: str
+    readable: bool = True
+    writable: bool = False
+    poll: bool = True
+    """Whether the column is part of the regular status request."""
+    encode: Callable[[Any], Any] | None = None
+    """Convert a value into the raw value sent in a `cmd` pack."""
+    values: Mapping[str, int] | None = None
+    """Symbolic values of an enumerated column."""
+    capability: str | None = None
+    """Device attribute recording whether the column is supported."""
+
+
+@dataclass(frozen=True)
+class GreeDerivedValue:
+    """Describes a value decoded from one or more raw columns."""
+
+    key: str
+    columns: tuple[str, ...]
+    decode: Callable[..., Any]
+    encode: Callable[[Any], tuple] | None = None
+
+
+def decode_hi_lo_temperature(hi, lo):
+    """Decode a Hi/Lo column pair into °C (Hi is offset by 100, Lo holds tenths)."""
+    if hi in (None, "") or lo in (None, ""):
+        return None
+    return (hi - 100) + (lo / 10)
+
+
+def encode_hi_lo_temperature(temp_c):
+    """Encode a °C value into its Hi/Lo column pair."""
+    tenths = int(round(temp_c * 10))
+    hi, lo = divmod(tenths, 10)
+    return hi + 100, lo
+
+
+COLUMNS: tuple[GreeColumn, ...] = (
+    GreeColumn("Pow", writable=True, encode=int),
+    GreeColumn("Mod", writable=True, encode=int, values=MODES_MAPPING["Mod"]),
+    GreeColumn("WatBoxTemSet", writable=True, encode=int),
+    GreeColumn("HeWatOutTemSet", writable=True, encode=int),
+    GreeColumn("WatBoxTemHi", capability="_has_temp_sensor"),
+    GreeColumn("WatBoxTemLo"),
+    GreeColumn("OutEnvTem", poll=False, capability="_has_outside_temp_sensor"),
+    GreeColumn("DwatSen", poll=False, capability="_has_room_humidity_sensor"),
+    GreeColumn("LigSen", poll=False, capability="_has_light_sensor"),
+    GreeColumn("AntiDirectBlow", poll=False, capability="_has_anti_direct_blow"),
+    # Extended heat-pump registers, requested by the sensor entities in the same status request
+    GreeColumn("AllInWatTemHi", poll=False, capability="_has_water_inlet_sensor"),
+    GreeColumn("AllInWatTemLo", poll=False),
+    GreeColumn("AllOutWatTemHi", poll=False, capability="_has_water_outlet_sensor"),
+    GreeColumn("AllOutWatTemLo", poll=False),
+    # 0 is a valid value of these, so they cannot be probed like the sensors above
+    GreeColumn("CompRunSta", poll=False),
+    GreeColumn("WatPumpRunSta", poll=False),
+    GreeColumn("ErrCode", poll=False),
+)
+
+DERIVED_VALUES: tuple[GreeDerivedValue, ...] = (
+    GreeDerivedValue(
+        key="tank_temperature",
+        columns=("WatBoxTemHi", "WatBoxTemLo"),
+        decode=decode_hi_lo_temperature,
+        encode=encode_hi_lo_temperature,
+    ),
+    GreeDerivedValue(
+        key="water_inlet_temperature",
+        columns=("AllInWatTemHi", "AllInWatTemLo"),
+        decode=decode_hi_lo_temperature,
+    ),
+    GreeDerivedValue(
+        key="water_outlet_temperature",
+        columns=("AllOutWatTemHi", "AllOutWatTemLo"),
+        decode=decode_hi_lo_temperature,
+    ),
+)
+
+COLUMN_INDEX: dict[str, int] = {column.name: index for index, column in enumerate(COLUMNS)}
+COLUMNS_BY_NAME: dict[str, GreeColumn] = {column.name: column for column in COLUMNS}
+DERIVED_BY_KEY: dict[str, GreeDerivedValue] = {value.key: value for value in DERIVED_VALUES}
+
+POLL_COLUMNS: tuple[str, ...] = tuple(column.name for column in COLUMNS if column.readable and column.poll)
+WRITABLE_COLUMNS: tuple[str, ...] = tuple(column.name for column in COLUMNS if column.writable)
+CAPABILITY_COLUMNS: dict[str, str] = {column.capability: column.name for column in COLUMNS if column.capability}
+
+
+@dataclass(frozen=True)
+class ColumnPlan:
+    """Precomputed layout of a `cols` list against the registry."""
+
+    names: tuple[str, ...]
+    indices: tuple[int | None, ...]
+    """Registry slot of each column, None for columns outside the registry."""
+
+
+@lru_cache(maxsize=64)
+def _plan(names: tuple[str, ...]) -> ColumnPlan:
+    return ColumnPlan(names, tuple(COLUMN_INDEX.get(name) for name in names))
+
+
+def plan_for(names: Iterable[str]) -> ColumnPlan:
+    """Return the (cached) plan for a list of column names."""
+    return _plan(tuple(names))
+
+
+def decode_columns(raw: Mapping[str, Any]) -> dict[str, Any]:
+    """Decode raw column values: Hi/Lo pairs become their derived value, enumerated columns their symbol.
+
+    Columns outside the registry, and registry columns without a decoding,
+    are passed through unchanged.
+    """
+    decoded: dict[str, Any] = {}
+    combined: set[str] = set()
+    for value in DERIVED_VALUES:
+        if all(name in raw for name in value.columns):
+            decoded[value.key] = value.decode(*(raw[name] for name in value.columns))
+            combined.update(value.columns)
+    for name, raw_value in raw.items():
+        if name in combined:
+            continue
+        column = COLUMNS_BY_NAME.get(name)
+        if column is not None and column.values is not None:
+            symbols = {number: symbol for symbol, number in column.values.items()}
+            decoded[name] = symbols.get(raw_value, raw_value)
+        else:
+            decoded[name] = raw_value
+    return decoded
+
+
+def registry_order(names: Iterable[str]) -> tuple[str, ...]:
+    """Deduplicate column names, registry columns first in registry order."""
+    wanted = set(names)
+    ordered = [column.name for column in COLUMNS if column.name in wanted]
+    ordered.extend(sorted(wanted.difference(COLUMN_INDEX)))
+    return tuple(ordered)
+
+
+class GreeState:
+    """Fixed-layout record of the last values reported by a device.
+
+    Registry columns live in a list slot each; columns outside the registry
+    (e.g. ad-hoc reads) are kept in a small side dict.
+    """
+
+    __slots__ = ("_values", "_extra")
+
+    def __init__(self) -> None:
+        self._values: list[Any] = [None] * len(COLUMNS)
+        self._extra: dict[str, Any] = {}
+
+    def apply(self, plan: ColumnPlan, dat: Iterable[Any]) -> None:
+        """Store a `dat` array laid out according to `plan`."""
+        values = self._values
+        for index, name, raw in zip(plan.indices, plan.names, dat):
+            if index is None:
+                self._extra[name] = raw
+            else:
+                values[index] = raw
+
+    def update(self, options: Mapping[str, Any]) -> None:
+        for name, value in options.items():
+            self[name] = value
+
+    def derived(self, key: str) -> Any:
+        """Return a decoded derived value, e.g. `tank_temperature`."""
+        value = DERIVED_BY_KEY[key]
+        return value.decode(*(self.get(name) for name in value.columns))
+
+    def get(self, name: str, default: Any = None) -> Any:
+        index = COLUMN_INDEX.get(name)
+        if index is None:
+            return self._extra.get(name, default)
+        value = self._values[index]
+        return default if value is None else value
+
+    def discard(self, name: str) -> None:
+        """Forget the value of a column (a registry column goes back to unknown)."""
+        index = COLUMN_INDEX.get(name)
+        if index is None:
+            self._extra.pop(name, None)
+        else:
+            self._values[index] = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the known values as a plain dict."""
+        result = {column.name: value for column, value in zip(COLUMNS, self._values) if value is not None}
+        result.update(self._extra)
+        return result
+
+    def __getitem__(self, name: str) -> Any:
+        index = COLUMN_INDEX.get(name)
+        if index is None:
+            return self._extra[name]
+        return self._values[index]
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        index = COLUMN_INDEX.get(name)
+        if index is None:
+            self._extra[name] = value
+        else:
+            self._values[index] = value
+
+    def __contains__(self, name: str) -> bool:
+        return name in COLUMN_INDEX or name in self._extra
+
+    def __repr__(self) -> str:
+        return f"GreeState({self.as_dict()!r})"
@@ -26,6 +26,9 @@ from .const import (
     CONF_ENCRYPTION_KEY,
     CONF_ENCRYPTION_VERSION,
     CONF_HVAC_MODES,
+    CONF_RELAY,
+    CONF_RELAY_SECRET,
+    CONF_TELEMETRY_EXPORT,
     CONF_TEMP_SENSOR_OFFSET,
     CONF_UID,
     DEFAULT_HVAC_MODES,
@@ -33,7 +36,10 @@ from .const import (
     DOMAIN,
     OPTION_KEYS,
 )
-from .gree_protocol import test_connection, discover_gree_devices, detect_device_encryption
+from .discovery import async_get_discovery_index
+from .gree_protocol import test_connection, detect_device_encryption
+from .export import EXPORT_FORMATS
+from .transport import parse_relay
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -89,8 +95,13 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             # If no matching device found, something went wrong - go to manual
             return await self.async_step_manual()
 
-        # Discover devices
-        self._discovered_devices = await discover_gree_devices(self.hass)
+        # Discover devices, answering from the background index when it is recent
+        index = async_get_discovery_index(self.hass)
+        if index.is_fresh() and index.devices:
+            self._discovered_devices = index.as_discovery_list()
+        else:
+            await index.async_scan()
+            self._discovered_devices = index.as_discovery_list()
 
         if not self._discovered_devices:
             # No devices found, go to manual entry
@@ -233,7 +244,13 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         self.config_entry = config_entry
 
     async def async_step_init(self, user_input: dict | None = None) -> FlowResult:
-        if user_input is not None:
+        errors = {}
+        if user_input is not None and user_input.get(CONF_RELAY):
+            try:
+                parse_relay(user_input[CONF_RELAY])
+            except ValueError:
+                errors[CONF_RELAY] = "invalid_relay"
+        if user_input is not None and not errors:
             _LOGGER.debug("Raw user options input: %s", user_input)
             normalized_input: dict[str, str | None] = {}
             # Only handle known option keys
@@ -265,6 +282,18 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_TEMP_SENSOR_OFFSET,
                     description={"suggested_value": options.get(CONF_TEMP_SENSOR_OFFSET)},
                 ): vol.Any(None, bool),
+                vol.Optional(
+                    CONF_RELAY,
+                    description={"suggested_value": options.get(CONF_RELAY)},
+                ): str,
+                vol.Optional(
+                    CONF_RELAY_SECRET,
+                    description={"suggested_value": options.get(CONF_RELAY_SECRET)},
+                ): selector.TextSelector(selector.TextSelectorConfig(type=selector.TextSelectorType.PASSWORD)),
+                vol.Optional(
+                    CONF_TELEMETRY_EXPORT,
+                    description={"suggested_value": options.get(CONF_TELEMETRY_EXPORT)},
+                ): vol.Any(None, selector.SelectSelector(selector.SelectSelectorConfig(options=EXPORT_FORMATS, translation_key=CONF_TELEMETRY_EXPORT))),
             }
         )
-        return self.async_show_form(step_id="init", data_schema=schema)
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
@@ -6,6 +6,13 @@ CONF_UID = 'uid'
 CONF_ENCRYPTION_VERSION = 'encryption_version'
 CONF_DISABLE_AVAILABLE_CHECK  = 'disable_available_check'
 CONF_TEMP_SENSOR_OFFSET = 'temp_sensor_offset'
+CONF_RELAY = 'relay'
+CONF_RELAY_SECRET = 'relay_secret'
+CONF_TELEMETRY_EXPORT = 'telemetry_export'
+
+# Shared objects kept in hass.data[DOMAIN] next to the per-entry data
+DATA_DISCOVERY = "discovery"
+DATA_STARTUP_GATE = "startup_gate"
 
 DEFAULT_PORT = 7000
 DEFAULT_TARGET_TEMP_STEP = 1
@@ -18,6 +25,24 @@ MAX_TEMP_F = 149
 
 TEMSEN_OFFSET = 40
 
+# Most columns requested in one status pack, by model (as reported in the scan reply).
+# Larger column sets are split. The size is halved and remembered after a module repeatedly
+# drops the reply at the same size, and doubled again (up to the model limit) after a run of successes.
+DEFAULT_STATUS_CHUNK_SIZE = 24
+STATUS_CHUNK_SIZES: dict[str, int] = {}
+STATUS_CHUNK_SHRINK_AFTER = 3
+STATUS_CHUNK_GROW_AFTER = 200
+
+# Packets per second sent by the whole integration, burst size and most requests waiting for a slot
+PACKET_RATE = 20
+PACKET_BURST = 20
+PACKET_MAX_WAITING = 200
+
+# First refreshes at Home Assistant start are spread randomly over this many seconds,
+# with at most STARTUP_CONCURRENCY devices binding/fetching at the same time
+STARTUP_WINDOW = 30
+STARTUP_CONCURRENCY = 4
+
 # HVAC modes - these come from Home Assistant and are standard
 DEFAULT_HVAC_MODES = ["auto", "cool", "dry", "fan_only", "heat", "off"]
 PRESET_MODES = ["Boyler", "Boyler ve Kalorifer"]
@@ -26,6 +51,15 @@ OPTION_KEYS = {
     CONF_HVAC_MODES,
     CONF_DISABLE_AVAILABLE_CHECK,
     CONF_TEMP_SENSOR_OFFSET,
+    CONF_RELAY,
+    CONF_RELAY_SECRET,
+    CONF_TELEMETRY_EXPORT,
+}
+# Option keys the running device applies in place, without reloading the entry
+LIVE_OPTION_KEYS = {
+    CONF_HVAC_MODES,
+    CONF_DISABLE_AVAILABLE_CHECK,
+    CONF_TEMP_SENSOR_OFFSET,
 }
 
 MODES_MAPPING = {
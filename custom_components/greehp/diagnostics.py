@@ -0,0 +1,56 @@
+"""Diagnostics support for the Gree integration."""
+
+from __future__ import annotations
+
+# Standard library imports
+from typing import Any
+
+# Home Assistant imports
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+# Local imports
+from .climate import SCAN_INTERVAL
+from .columns import CAPABILITY_COLUMNS
+from .const import CONF_ENCRYPTION_KEY, CONF_RELAY_SECRET, CONF_UID, DOMAIN
+from .gree_protocol import PACKET_BUDGET
+
+# Encryption keys appear in the entry data and in bind responses, the relay secret in the options
+TO_REDACT = {CONF_ENCRYPTION_KEY, CONF_UID, CONF_RELAY_SECRET, "key"}
+
+
+def _isoformat(value) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    device = entry_data["device"]
+
+    return {
+        "entry": async_redact_data({"data": dict(entry.data), "options": dict(entry.options)}, TO_REDACT),
+        "device": {
+            "name": device._name,
+            "host": device._ip_addr,
+            "port": device._port,
+            "firmware_version": device._firmware_version,
+            "encryption_version": device.encryption_version,
+            "bound": device._encryption_key is not None,
+            "online": device._device_online,
+            "disable_available_check": device._disable_available_check,
+        },
+        "capabilities": {capability: getattr(device, capability) for capability in CAPABILITY_COLUMNS},
+        "ac_options": device._acOptions.as_dict(),
+        "poll": {
+            "scan_interval": SCAN_INTERVAL.total_seconds(),
+            "columns": list(device._fetch_plan.names),
+            "last_sync": _isoformat(device._last_sync),
+            "last_sync_error": _isoformat(device._last_sync_error),
+            "update_in_progress": device._update_lock.locked(),
+            "telemetry_samples": len(device.telemetry),
+        },
+        "packet_budget": PACKET_BUDGET.as_dict(),
+        "exchanges": async_redact_data(list(device._exchanges), TO_REDACT),
+    }
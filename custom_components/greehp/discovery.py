@@ -0,0 +1,145 @@
+"""Background discovery index of Gree devices on the local network."""
+
+from __future__ import annotations
+
+# Standard library imports
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from datetime import timedelta
+
+# Home Assistant imports
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+# Local imports
+from .const import DATA_DISCOVERY, DOMAIN
+from .gree_protocol import discover_gree_devices
+from .helpers import normalize_mac
+
+_LOGGER = logging.getLogger(__name__)
+
+# Low-frequency background scan
+DISCOVERY_INTERVAL = timedelta(minutes=15)
+# Results younger than this are good enough for config flows
+DISCOVERY_MAX_AGE = timedelta(minutes=20)
+# Broadcast replies get lost, so a device only counts as gone after missing this many scans in a row
+GONE_AFTER_MISSED_SCANS = 2
+
+
+@dataclass
+class DiscoveredDevice:
+    """A Gree device seen in a discovery scan."""
+
+    mac: str
+    host: str
+    port: int
+    name: str
+    brand: str
+    model: str
+    version: str
+    last_seen: float
+    missed_scans: int = 0
+    """Scans in a row this device did not answer."""
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class GreeDiscoveryIndex:
+    """MAC-indexed table of the Gree devices seen on the network."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._devices: dict[str, DiscoveredDevice] = {}
+        self._lock = asyncio.Lock()
+        self._unsub = None
+        self.last_scan: float | None = None
+
+    def get(self, mac: str) -> DiscoveredDevice | None:
+        """Look a device up by MAC address."""
+        return self._devices.get(normalize_mac(mac))
+
+    @property
+    def devices(self) -> list[DiscoveredDevice]:
+        return list(self._devices.values())
+
+    def is_fresh(self, max_age: timedelta = DISCOVERY_MAX_AGE) -> bool:
+        return self.last_scan is not None and time.time() - self.last_scan < max_age.total_seconds()
+
+    def is_gone(self, mac: str) -> bool:
+        """Return True if the device missed several scans in a row, spanning more than a whole interval."""
+        if self.last_scan is None:
+            return False
+        device = self.get(mac)
+        if device is None:
+            return False  # never seen, e.g. on another subnet
+        return device.missed_scans >= GONE_AFTER_MISSED_SCANS and self.last_scan - device.last_seen > DISCOVERY_INTERVAL.total_seconds()
+
+    def as_discovery_list(self) -> list[dict]:
+        """Return the devices in the format of `discover_gree_devices`."""
+        return [
+            {
+                "name": device.name,
+                "host": device.host,
+                "port": device.port,
+                "mac": device.mac,
+                "brand": device.brand,
+                "model": device.model,
+                "version": device.version,
+            }
+            for device in self._devices.values()
+        ]
+
+    async def async_scan(self, timeout: int = 5) -> list[dict]:
+        """Run a discovery scan now and merge its results into the index."""
+        async with self._lock:
+            found = await discover_gree_devices(self._hass, timeout=timeout)
+            now = time.time()
+            for device in self._devices.values():
+                device.missed_scans += 1
+            for info in found:
+                mac = normalize_mac(info["mac"])
+                self._devices[mac] = DiscoveredDevice(
+                    mac=info["mac"],
+                    host=info["host"],
+                    port=info["port"],
+                    name=info["name"],
+                    brand=info["brand"],
+                    model=info["model"],
+                    version=info["version"],
+                    last_seen=now,
+                )
+            self.last_scan = now
+            _LOGGER.debug("Discovery index holds %d devices (%d seen in this scan)", len(self._devices), len(found))
+            return found
+
+    async def _async_scheduled_scan(self, _now=None) -> None:
+        try:
+            await self.async_scan()
+        except Exception as e:
+            _LOGGER.debug("Background discovery scan failed: %s", e)
+
+    @callback
+    def async_start(self) -> None:
+        """Start the background scans (no-op if already running)."""
+        if self._unsub is not None:
+            return
+        self._unsub = async_track_time_interval(self._hass, self._async_scheduled_scan, DISCOVERY_INTERVAL, cancel_on_shutdown=True)
+        self._hass.async_create_background_task(self._async_scheduled_scan(), name=f"{DOMAIN} discovery scan")
+
+    @callback
+    def async_stop(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+
+@callback
+def async_get_discovery_index(hass: HomeAssistant) -> GreeDiscoveryIndex:
+    """Return the shared discovery index, creating it if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_DISCOVERY not in domain_data:
+        domain_data[DATA_DISCOVERY] = GreeDiscoveryIndex(hass)
+    return domain_data[DATA_DISCOVERY]
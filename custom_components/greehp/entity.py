@@ -35,6 +35,8 @@ class GreeEntityDescription:
     value_fn: Callable[[object], Any] = None
     available_fn: Callable[[object], bool] = lambda device: True
     icon_fn: Callable[[Any, object], str] = None
+    columns: tuple[str, ...] = ()
+    """Gree columns the entity needs in the device's status request."""
 
 
 class GreeEntity(Entity):
@@ -61,6 +63,18 @@ class GreeEntity(Entity):
 
             self._attr_unique_id = f"{self._device._mac_addr}_{self.entity_description.key}"
 
+    async def async_added_to_hass(self) -> None:
+        """Request the entity's columns in the device poll."""
+        await super().async_added_to_hass()
+        if self.entity_description.columns:
+            self._device.register_columns(self._attr_unique_id, self.entity_description.columns)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop polling columns for a removed or disabled entity."""
+        await super().async_will_remove_from_hass()
+        if self.entity_description.columns:
+            self._device.unregister_columns(self._attr_unique_id)
+
     @property
     def device_info(self) -> DeviceInfo:
         """Return device information."""
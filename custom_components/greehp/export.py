@@ -0,0 +1,174 @@
+"""Export of poll results to rolling CSV or Parquet files."""
+
+from __future__ import annotations
+
+# Standard library imports
+import asyncio
+import csv
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+# Home Assistant imports
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.event import async_track_time_interval
+
+# Local imports
+from .columns import COLUMNS, DERIVED_VALUES
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ["csv", "parquet"]
+EXPORT_DIRECTORY = "greehp_telemetry"
+# Rows are written in batches, at the latest after FLUSH_INTERVAL
+FLUSH_INTERVAL = timedelta(minutes=5)
+FLUSH_ROWS = 500
+# A new file is started when the current one reaches either limit; older files beyond KEEP_FILES are deleted
+ROTATE_BYTES = 16 * 1024 * 1024
+ROTATE_AGE = timedelta(days=1)
+KEEP_FILES = 60
+
+# Raw columns and derived values, all numeric
+VALUE_FIELDS = (*(column.name for column in COLUMNS), *(value.key for value in DERIVED_VALUES), "outside_temperature")
+FIELDS = ("time", "mac", *VALUE_FIELDS)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+class _CsvFile:
+    def __init__(self, path):
+        self._file = open(path, "a", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(FIELDS)
+
+    def write(self, rows):
+        self._writer.writerows([row["time"].isoformat(), *(row.get(field) for field in FIELDS[1:])] for row in rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetFile:
+    def __init__(self, path, pyarrow):
+        self._pyarrow = pyarrow
+        self._schema = pyarrow.schema(
+            [("time", pyarrow.timestamp("ms", tz="UTC")), ("mac", pyarrow.string())]
+            + [(field, pyarrow.float64()) for field in VALUE_FIELDS]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+
+    def write(self, rows):
+        # One row group per batch
+        self._writer.write_table(self._pyarrow.Table.from_pylist(rows, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class TelemetryExporter:
+    """
+    Buffers poll results in memory and appends them to files in batches.
+
+    Files live in `<config>/greehp_telemetry/<mac>/`. All file I/O runs in
+    the executor, one batch at a time, so the event loop only appends to a
+    list no matter how often the device is polled.
+    """
+
+    def __init__(self, hass: HomeAssistant, mac: str, export_format: str) -> None:
+        self._hass = hass
+        self._mac = mac
+        self._format = export_format
+        self._directory = hass.config.path(EXPORT_DIRECTORY, mac)
+        self._pyarrow = None
+        self._rows: list[dict] = []
+        self._lock = asyncio.Lock()
+        self._file = None
+        self._path: str | None = None
+        self._opened: float | None = None
+        self._unsub = None
+        self.rows_written = 0
+
+    async def async_start(self) -> None:
+        if self._format == "parquet":
+            self._pyarrow = await self._hass.async_add_executor_job(_import_pyarrow)
+            if self._pyarrow is None:
+                _LOGGER.warning("%s: pyarrow is not installed, exporting telemetry as CSV instead of Parquet", self._mac)
+                self._format = "csv"
+        self._unsub = async_track_time_interval(self._hass, self._async_scheduled_flush, FLUSH_INTERVAL, cancel_on_shutdown=True)
+
+    def record(self, state, outside_temperature=None) -> None:
+        """Buffer one poll result (a GreeState)."""
+        row = {"time": datetime.now(timezone.utc), "mac": self._mac}
+        for column in COLUMNS:
+            value = state.get(column.name)
+            row[column.name] = None if value == "" else value
+        for value in DERIVED_VALUES:
+            row[value.key] = state.derived(value.key)
+        row["outside_temperature"] = outside_temperature
+        self._rows.append(row)
+        if len(self._rows) >= FLUSH_ROWS:
+            self._hass.async_create_background_task(self.async_flush(), name=f"greehp {self._mac} telemetry flush")
+
+    async def _async_scheduled_flush(self, _now=None) -> None:
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Write the buffered rows in the executor."""
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        async with self._lock:
+            try:
+                await self._hass.async_add_executor_job(self._write, rows)
+            except OSError as e:
+                _LOGGER.error("%s: Failed to export %d telemetry rows: %s", self._mac, len(rows), e)
+
+    async def async_stop(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        await self.async_flush()
+        async with self._lock:
+            await self._hass.async_add_executor_job(self._close)
+
+    def _write(self, rows: list[dict]) -> None:
+        if self._file is None or self._should_rotate():
+            self._rotate()
+        self._file.write(rows)
+        self.rows_written += len(rows)
+
+    def _should_rotate(self) -> bool:
+        if time.time() - self._opened >= ROTATE_AGE.total_seconds():
+            return True
+        return os.path.getsize(self._path) >= ROTATE_BYTES
+
+    def _rotate(self) -> None:
+        self._close()
+        os.makedirs(self._directory, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+        self._path = os.path.join(self._directory, f"{self._mac}_{stamp}.{self._format}")
+        suffix = 0
+        while os.path.exists(self._path):
+            suffix += 1
+            self._path = os.path.join(self._directory, f"{self._mac}_{stamp}_{suffix}.{self._format}")
+        self._file = _ParquetFile(self._path, self._pyarrow) if self._format == "parquet" else _CsvFile(self._path)
+        self._opened = time.time()
+        _LOGGER.debug("%s: Exporting telemetry to %s", self._mac, self._path)
+
+        files = sorted(name for name in os.listdir(self._directory) if name.startswith(f"{self._mac}_"))
+        for name in files[:-KEEP_FILES]:
+            os.remove(os.path.join(self._directory, name))
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -21,9 +21,15 @@ from homeassistant.const import CONF_HOST, CONF_PORT, CONF_MAC
 from homeassistant.components.network import async_get_ipv4_broadcast_addresses
 
 # Local imports
+from .capture import REQUEST, RESPONSE
+from .ratelimit import PRIORITY_POLL, PRIORITY_RETRY, PacketBudget, PacketDropped
+from .transport import RelayTransport, UdpTransport, parse_relay
 from .const import (
     CONF_ENCRYPTION_VERSION,
     CONF_ENCRYPTION_KEY,
+    PACKET_RATE,
+    PACKET_BURST,
+    PACKET_MAX_WAITING,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -33,25 +39,92 @@ GCM_ADD = b"qualcomm-test"
 GENERIC_GREE_DEVICE_KEY = "a3K8Bx%2r8Y7#xDh"
 GENERIC_GREE_DEVICE_KEY_GCM = b"{yxAHAY_Lm6pbC/<"
 
+# Active capture writers (see capture.py): (ip_addr, port) -> {owner: writer}. Sub-units sharing
+# a host each keep their own writer, and every writer of a host records all datagrams to it
+_CAPTURES = {}
 
-async def FetchResult(cipher, ip_addr, port, json_data, encryption_version=1, max_retries=8):
-    """Send a request to a Gree device and fetch the result, with retries and timeouts."""
+# Shared by all devices, see ratelimit.py
+PACKET_BUDGET = PacketBudget(PACKET_RATE, PACKET_BURST, PACKET_MAX_WAITING)
+
+# Devices reached through a relay instead of direct UDP: (ip_addr, port) -> {owner: transport}.
+# Sub-units sharing a host each hold their own route, so removing one keeps the others relayed
+UDP_TRANSPORT = UdpTransport()
+_ROUTES = {}
+# One connection per relay address and secret, shared by the devices behind it
+_RELAYS = {}
+
+
+def start_capture(ip_addr, port, owner, writer):
+    """Record every datagram exchanged with a device into `owner`'s `writer`."""
+    _CAPTURES.setdefault((ip_addr, port), {})[owner] = writer
+
+
+def stop_capture(ip_addr, port, owner):
+    """Stop `owner`'s recording of a device and return its writer, if any."""
+    writers = _CAPTURES.get((ip_addr, port))
+    if not writers:
+        return None
+    writer = writers.pop(owner, None)
+    if not writers:
+        del _CAPTURES[(ip_addr, port)]
+    return writer
+
+
+def set_relay(ip_addr, port, owner, relay, secret=None):
+    """Send `owner`'s requests for a device through the relay at `relay` ("host[:port]"), or drop its route if empty."""
+    routes = _ROUTES.setdefault((ip_addr, port), {})
+    if not relay:
+        routes.pop(owner, None)
+        if not routes:
+            del _ROUTES[(ip_addr, port)]
+        return
+    key = (*parse_relay(relay), secret or None)
+    if key not in _RELAYS:
+        _RELAYS[key] = RelayTransport(*key)
+    routes[owner] = _RELAYS[key]
+
+
+def _route(ip_addr, port):
+    routes = _ROUTES.get((ip_addr, port))
+    return next(iter(routes.values())) if routes else UDP_TRANSPORT
+
+
+async def async_close_relays():
+    """Close the relay connections no device routes through anymore."""
+    in_use = {id(transport) for routes in _ROUTES.values() for transport in routes.values()}
+    for address, transport in list(_RELAYS.items()):
+        if id(transport) not in in_use:
+            await transport.async_close()
+            del _RELAYS[address]
+
+
+async def FetchResult(cipher, ip_addr, port, json_data, encryption_version=1, max_retries=8, trace=None, timeout=2, priority=PRIORITY_POLL):
+    """Send a request to a Gree device and fetch the result, with retries and timeouts.
+
+    If `trace` is a dict, it is filled with per-attempt latency, payload sizes
+    and the decrypted response.
+    """
 
     _LOGGER.debug(f"Fetching device at: {ip_addr}:{port}, data sent: {json_data})")
 
-    timeout = 2
+    captures = tuple(_CAPTURES.get((ip_addr, port), {}).values())
+    transport = _route(ip_addr, port)
+    if trace is not None:
+        trace["request_size"] = len(json_data)
+        trace["attempts"] = []
 
     for attempt in range(max_retries):
-        clientSock = None
+        # Raises PacketDropped when shed; retries only go out with spare budget
+        await PACKET_BUDGET.acquire(priority if attempt == 0 else PRIORITY_RETRY)
+        started = time.monotonic()
         try:
-            clientSock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            clientSock.settimeout(timeout)
-
-            # Send data to device
-            clientSock.sendto(bytes(json_data, "utf-8"), (ip_addr, port))
-
-            # Receive response with event loop yielding
-            data, _ = await asyncio.wait_for(asyncio.get_event_loop().run_in_executor(None, clientSock.recvfrom, 64000), timeout=timeout)
+            # Send data to device and wait for the response
+            payload = bytes(json_data, "utf-8")
+            for capture in captures:
+                capture.write(REQUEST, payload)
+            data = await transport.exchange(ip_addr, port, payload, timeout)
+            for capture in captures:
+                capture.write(RESPONSE, data)
 
             # Parse and decrypt response
             received_json = simplejson.loads(data)
@@ -73,21 +146,20 @@ async def FetchResult(cipher, ip_addr, port, json_data, encryption_version=1, ma
             result = simplejson.loads(clean_text)
 
             _LOGGER.debug(f"Successfully received response on attempt {attempt + 1}")
+            if trace is not None:
+                trace["attempts"].append({"latency": round(time.monotonic() - started, 3)})
+                trace["response_size"] = len(data)
+                trace["response"] = result
             return result
 
         except Exception as e:
+            if trace is not None:
+                trace["attempts"].append({"latency": round(time.monotonic() - started, 3), "error": type(e).__name__})
             if attempt == max_retries - 1:
                 error_msg = f"{type(e).__name__}: {str(e)}" if str(e) else f"{type(e).__name__}"
                 _LOGGER.error(f"All {max_retries} attempts failed for {ip_addr}:{port}. Error: {error_msg}")
                 raise
 
-        finally:
-            if clientSock:
-                try:
-                    clientSock.close()
-                except Exception as e:
-                    _LOGGER.debug(f"Error closing socket: {str(e)}")
-
         # Progressive backoff before retry
         if attempt < max_retries - 1:
             await asyncio.sleep(0.5 + (attempt * 0.3))  # 0.5s, 0.8s, 1.1s, 1.4s, 1.7s, 2.0s, 2.3s
@@ -124,15 +196,17 @@ async def test_connection(config):
         return False
 
 
-async def GetDeviceKey(mac_addr, ip_addr, port, max_retries=8):
+async def GetDeviceKey(mac_addr, ip_addr, port, max_retries=8, trace=None):
     _LOGGER.debug("Retrieving HVAC encryption key")
     cipher = AES.new(GENERIC_GREE_DEVICE_KEY.encode("utf8"), AES.MODE_ECB)
     pack = base64.b64encode(cipher.encrypt(Pad(f'{{"mac":"{mac_addr}","t":"bind","uid":0}}').encode("utf8"))).decode("utf-8")
     jsonPayloadToSend = f'{{"cid": "app","i": 1,"pack": "{pack}","t":"pack","tcid":"{mac_addr}","uid": 0}}'
     try:
-        result = await FetchResult(cipher, ip_addr, port, jsonPayloadToSend, max_retries=max_retries)
+        result = await FetchResult(cipher, ip_addr, port, jsonPayloadToSend, max_retries=max_retries, trace=trace)
         _LOGGER.debug(f"GetDeviceKey: FetchResult: {result}")
         key = result["key"].encode("utf8")
+    except PacketDropped:
+        raise  # not sent at all, the caller tries again later
     except Exception:
         _LOGGER.debug("Error getting device encryption key!")
         return None
@@ -141,6 +215,30 @@ async def GetDeviceKey(mac_addr, ip_addr, port, max_retries=8):
         return key
 
 
+async def ScanDevice(ip_addr, port, max_retries=2, trace=None, timeout=2):
+    """Send a unicast scan to a device and return its `dev` pack (mac, ver, model...).
+
+    Raises PacketDropped if the packet budget shed the scan, which says nothing about the device.
+    """
+    cipher = AES.new(GENERIC_GREE_DEVICE_KEY.encode("utf8"), AES.MODE_ECB)
+    try:
+        result = await FetchResult(cipher, ip_addr, port, '{"t":"scan"}', max_retries=max_retries, trace=trace, timeout=timeout)
+    except PacketDropped:
+        raise
+    except Exception:
+        _LOGGER.debug(f"No scan response from {ip_addr}:{port}")
+        return None
+    if result.get("t") != "dev":
+        _LOGGER.debug(f"Unexpected scan response from {ip_addr}:{port}: {result}")
+        return None
+    return result
+
+
+async def ProbeDevice(ip_addr, port, timeout=1, trace=None):
+    """Cheap liveness check: one unicast scan with a short deadline, no key needed."""
+    return await ScanDevice(ip_addr, port, max_retries=1, trace=trace, timeout=timeout) is not None
+
+
 def GetGCMCipher(key):
     cipher = AES.new(key, AES.MODE_GCM, nonce=GCM_IV)
     cipher.update(GCM_ADD)
@@ -155,15 +253,17 @@ def EncryptGCM(key, plaintext):
     return (pack, tag)
 
 
-async def GetDeviceKeyGCM(mac_addr, ip_addr, port, max_retries=8):
+async def GetDeviceKeyGCM(mac_addr, ip_addr, port, max_retries=8, trace=None):
     _LOGGER.debug("Retrieving HVAC encryption key (GCM)")
     plaintext = f'{{"cid":"{mac_addr}", "mac":"{mac_addr}","t":"bind","uid":0}}'
     pack, tag = EncryptGCM(GENERIC_GREE_DEVICE_KEY_GCM, plaintext)
     jsonPayloadToSend = f'{{"cid": "app","i": 1,"pack": "{pack}","t":"pack","tcid":"{mac_addr}","uid": 0, "tag" : "{tag}"}}'
     try:
-        result = await FetchResult(GetGCMCipher(GENERIC_GREE_DEVICE_KEY_GCM), ip_addr, port, jsonPayloadToSend, encryption_version=2, max_retries=max_retries)
+        result = await FetchResult(GetGCMCipher(GENERIC_GREE_DEVICE_KEY_GCM), ip_addr, port, jsonPayloadToSend, encryption_version=2, max_retries=max_retries, trace=trace)
         _LOGGER.debug(f"GetDeviceKeyGCM: FetchResult: {result}")
         key = result["key"].encode("utf8")
+    except PacketDropped:
+        raise
     except Exception:
         _LOGGER.debug("Error getting device encryption key!")
         return None
@@ -172,6 +272,67 @@ async def GetDeviceKeyGCM(mac_addr, ip_addr, port, max_retries=8):
         return key
 
 
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Collects the replies to a broadcast scan."""
+
+    def __init__(self):
+        self.replies = []
+
+    def datagram_received(self, data, addr):
+        self.replies.append((data, addr))
+
+    def error_received(self, exc):
+        _LOGGER.debug(f"Discovery socket error: {exc}")
+
+
+def _parse_discovery_reply(data, addr, port):
+    """Return the device info of a scan reply, or None if it is not a Gree device."""
+    try:
+        # Try to parse as JSON and decrypt if possible
+        response = simplejson.loads(data.decode(errors="ignore"))
+    except Exception as e:
+        _LOGGER.debug(f"Could not parse response from {addr}: {e}")
+        return None
+    if "pack" not in response:
+        _LOGGER.debug(f"Received response without pack from {addr}: {response}")
+        return None
+
+    # Discovery responses typically use level 1 encryption (ECB mode)
+    # But we need to test which encryption the device actually uses for communication
+    try:
+        cipher = AES.new(GENERIC_GREE_DEVICE_KEY.encode("utf-8"), AES.MODE_ECB)
+        decrypted_pack = cipher.decrypt(base64.b64decode(response["pack"]))
+        # Remove null bytes and trailing data after last }
+        decoded_text = decrypted_pack.decode("utf-8", errors="ignore").replace("\x0f", "")
+        last_brace = decoded_text.rfind("}")
+        clean_text = decoded_text[: last_brace + 1] if last_brace != -1 else decoded_text
+        pack_json = simplejson.loads(clean_text)
+        _LOGGER.debug(f"Decrypted discovery response from {addr}")
+    except Exception as e:
+        _LOGGER.debug(f"Could not decrypt discovery response from {addr}: {e}")
+        return None
+
+    # If we successfully decrypted and got device info
+    if not pack_json or pack_json.get("t") != "dev":
+        _LOGGER.debug(f"Invalid or missing device info from {addr}")
+        return None
+    mac_addr = pack_json.get("mac", "")
+    if not mac_addr:
+        _LOGGER.debug(f"No MAC address in response from {addr}")
+        return None
+
+    # Just collect basic device info for now - encryption detection happens later
+    return {
+        "name": pack_json.get("name", "") or f"Gree {mac_addr[-4:]}",
+        "host": addr[0],
+        "port": port,
+        "mac": mac_addr,
+        "brand": pack_json.get("brand", "gree"),
+        "model": pack_json.get("model", "gree"),
+        "version": pack_json.get("ver", ""),
+    }
+
+
 async def discover_gree_devices(hass, timeout=5):
     """Discover Gree devices on the local network using UDP broadcast."""
     _LOGGER.debug("Starting Gree device discovery...")
@@ -179,13 +340,12 @@ async def discover_gree_devices(hass, timeout=5):
     BROADCAST_PORT = 7000
     DISCOVERY_MESSAGE = b'{"t":"scan"}'
 
-    # Set up UDP socket for broadcast
+    # Set up a non-blocking UDP socket for broadcast, served by the event loop
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-    sock.settimeout(timeout)
+    sock.setblocking(False)
     sock.bind(("", 0))
-
-    devices = []
+    transport, protocol = await asyncio.get_running_loop().create_datagram_endpoint(_DiscoveryProtocol, sock=sock)
 
     try:
         # Default broadcast addresses to try
@@ -212,72 +372,21 @@ async def discover_gree_devices(hass, timeout=5):
         for broadcast_addr in broadcast_addresses:
             try:
                 _LOGGER.debug(f"Sending discovery to {broadcast_addr}")
-                sock.sendto(DISCOVERY_MESSAGE, (broadcast_addr, BROADCAST_PORT))
+                transport.sendto(DISCOVERY_MESSAGE, (broadcast_addr, BROADCAST_PORT))
             except Exception as e:
                 _LOGGER.debug(f"Failed to send to {broadcast_addr}: {e}")
 
         _LOGGER.debug("Sent discovery packets, waiting for replies...")
-
-        start = time.time()
-        while time.time() - start < timeout:
-            try:
-                data, addr = sock.recvfrom(1024)
-                try:
-                    # Try to parse as JSON and decrypt if possible
-                    response = simplejson.loads(data.decode(errors="ignore"))
-                    if "pack" in response:
-                        pack = response["pack"]
-                        decoded_pack = base64.b64decode(pack)
-
-                        # Discovery responses typically use level 1 encryption (ECB mode)
-                        # But we need to test which encryption the device actually uses for communication
-                        pack_json = None
-
-                        try:
-                            cipher = AES.new(GENERIC_GREE_DEVICE_KEY.encode("utf-8"), AES.MODE_ECB)
-                            decrypted_pack = cipher.decrypt(decoded_pack)
-                            # Remove null bytes and trailing data after last }
-                            decoded_text = decrypted_pack.decode("utf-8", errors="ignore").replace("\x0f", "")
-                            last_brace = decoded_text.rfind("}")
-                            if last_brace != -1:
-                                clean_text = decoded_text[: last_brace + 1]
-                            else:
-                                clean_text = decoded_text
-                            pack_json = simplejson.loads(clean_text)
-                            _LOGGER.debug(f"Decrypted discovery response from {addr}")
-                        except Exception as e:
-                            _LOGGER.debug(f"Could not decrypt discovery response from {addr}: {e}")
-                            continue
-
-                        # If we successfully decrypted and got device info
-                        if pack_json and pack_json.get("t") == "dev":
-                            mac_addr = pack_json.get("mac", "")
-                            if not mac_addr:
-                                _LOGGER.debug(f"No MAC address in response from {addr}")
-                                continue
-
-                            # Just collect basic device info for now - encryption detection happens later
-                            device_info = {
-                                "name": pack_json.get("name", "") or f"Gree {mac_addr[-4:]}",
-                                "host": addr[0],
-                                "port": BROADCAST_PORT,
-                                "mac": mac_addr,
-                                "brand": pack_json.get("brand", "gree"),
-                                "model": pack_json.get("model", "gree"),
-                                "version": pack_json.get("ver", ""),
-                            }
-                            devices.append(device_info)
-                            _LOGGER.debug(f"Discovered Gree device: {device_info}")
-                        else:
-                            _LOGGER.debug(f"Invalid or missing device info from {addr}")
-                    else:
-                        _LOGGER.debug(f"Received response without pack from {addr}: {response}")
-                except Exception as e:
-                    _LOGGER.debug(f"Could not parse response from {addr}: {e}")
-            except socket.timeout:
-                break
+        await asyncio.sleep(timeout)
     finally:
-        sock.close()
+        transport.close()
+
+    devices = []
+    for data, addr in protocol.replies:
+        device_info = _parse_discovery_reply(data, addr, BROADCAST_PORT)
+        if device_info is not None:
+            devices.append(device_info)
+            _LOGGER.debug(f"Discovered Gree device: {device_info}")
 
     _LOGGER.debug(f"Discovery completed, found {len(devices)} devices")
     return devices
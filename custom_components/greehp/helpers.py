@@ -1,5 +1,9 @@
 """Helper functions and classes for Gree integration."""
 
+# Standard library imports
+import math
+import statistics
+
 from .const import TEMSEN_OFFSET
 
 
@@ -21,6 +25,14 @@ class TempOffsetResolver:
         return raw
     else:
         return raw - 40
+
+    The decision only needs re-evaluating when a new min or max raw value
+    is seen, so most readings are a constant-time check of the latched
+    decision. The running values can be persisted with `as_dict()` and
+    restored with `restore()`; `calibrate()` seeds an undecided resolver
+    with recent, already corrected readings (e.g. from the recorder). That
+    history only steers the readings while the extremes are ambiguous; it
+    never latches or persists a decision.
     """
 
     def __init__(
@@ -37,14 +49,48 @@ class TempOffsetResolver:
         self._min_raw: float | None = None
         self._max_raw: float | None = None
         self._has_offset: bool | None = None  # undecided until True/False
+        self._reference: float | None = None  # typical corrected °C value, from history
 
     def __call__(self, raw: float) -> float:
+        extended = False
         if self._min_raw is None or raw < self._min_raw:
             self._min_raw = raw
+            extended = True
         if self._max_raw is None or raw > self._max_raw:
             self._max_raw = raw
-        self._evaluate()  # evaluate every time, so it can change it's mind as needed
-        return raw - self._offset if self._has_offset else raw
+            extended = True
+        if extended:
+            self._evaluate()  # re-evaluate on a new extreme, so it can change it's mind as needed
+        has_offset = self._has_offset
+        if has_offset is None and self._reference is not None:
+            # Still ambiguous: provisionally pick the reading closest to recent history
+            has_offset = abs(raw - self._offset - self._reference) < abs(raw - self._reference)
+        return raw - self._offset if has_offset else raw
+
+    @property
+    def has_offset(self) -> bool | None:
+        return self._has_offset
+
+    def as_dict(self) -> dict:
+        return {"min_raw": self._min_raw, "max_raw": self._max_raw, "has_offset": self._has_offset}
+
+    def restore(self, data: dict) -> None:
+        """Restore running values saved with `as_dict()`."""
+        self._min_raw = data.get("min_raw")
+        self._max_raw = data.get("max_raw")
+        self._has_offset = data.get("has_offset")
+        if self._min_raw is not None and self._max_raw is not None:
+            # The extremes decide on their own; this also drops a guess saved by older versions
+            self._has_offset = None
+            self._evaluate()
+
+    def calibrate(self, corrected_values) -> bool:
+        """Seed the resolver with recent corrected °C readings, in one batch."""
+        values = [float(value) for value in corrected_values if math.isfinite(value)]
+        if not values:
+            return False
+        self._reference = statistics.median(values)
+        return True
 
     def _evaluate(self) -> None:
         lo, hi = self._min_raw, self._max_raw
@@ -63,6 +109,95 @@ class TempOffsetResolver:
         return pen
 
 
+class IncrementalRegression:
+    """
+    Running least-squares fit of y over t, updated in O(1) per sample.
+
+    Only the sums needed for the slope are kept. An optional decay factor
+    (0 < decay <= 1) discounts older samples, so the fit follows the most
+    recent trend without storing any history.
+    """
+
+    def __init__(self, decay: float = 1.0):
+        self._decay = decay
+        self.reset()
+
+    def reset(self) -> None:
+        self._t0: float | None = None
+        self._n = 0.0
+        self._sx = 0.0
+        self._sy = 0.0
+        self._sxx = 0.0
+        self._sxy = 0.0
+        self.samples = 0
+
+    def add(self, t: float, y: float) -> None:
+        if self._t0 is None:
+            self._t0 = t
+        x = t - self._t0  # keep the sums small to avoid cancellation
+        d = self._decay
+        self._n = self._n * d + 1.0
+        self._sx = self._sx * d + x
+        self._sy = self._sy * d + y
+        self._sxx = self._sxx * d + x * x
+        self._sxy = self._sxy * d + x * y
+        self.samples += 1
+
+    @property
+    def slope(self) -> float | None:
+        """Return dy/dt, or None until two distinct samples were seen."""
+        if self.samples < 2:
+            return None
+        denominator = self._n * self._sxx - self._sx * self._sx
+        if denominator <= 1e-12:
+            return None
+        return (self._n * self._sxy - self._sx * self._sy) / denominator
+
+
+class RuntimeCounters:
+    """
+    Operating time per mode and number of starts, accumulated from observed states.
+
+    Each observation credits the time since the previous one to the mode that
+    was active then. Gaps longer than `max_gap` (missed polls, restarts) are
+    not credited, since the unit may have changed state in between.
+    """
+
+    def __init__(self, max_gap: float):
+        self._max_gap = max_gap
+        self.runtime: dict[str, float] = {}
+        self.starts = 0
+        self._on: bool | None = None
+        self._mode: str | None = None
+        self._since: float | None = None
+
+    def observe(self, mode: str | None, now: float) -> bool:
+        """Record the current mode, None while the unit is off; return True if it changed."""
+        if self._mode is not None and self._since is not None and 0 < now - self._since <= self._max_gap:
+            self.runtime[self._mode] = self.runtime.get(self._mode, 0.0) + now - self._since
+        on = mode is not None
+        if on and self._on is False:
+            self.starts += 1
+        changed = mode != self._mode or on != self._on
+        self._on = on
+        self._mode = mode
+        self._since = now
+        return changed
+
+    def as_dict(self) -> dict:
+        return {"runtime": dict(self.runtime), "starts": self.starts, "on": self._on}
+
+    def restore(self, data: dict) -> None:
+        self.runtime = dict(data.get("runtime", {}))
+        self.starts = data.get("starts", 0)
+        self._on = data.get("on")
+
+
+def normalize_mac(mac: str) -> str:
+    """Return a MAC address as lowercase hex digits without separators."""
+    return mac.lower().replace(":", "").replace("-", "")
+
+
 def gree_f_to_c(desired_temp_f):
     # Convert to fractional C values for AC
     # See: https://github.com/tomikaa87/gree-remote
@@ -42,6 +42,7 @@ NUMBERS: tuple[GreeNumberEntityDescription, ...] = (
         mode=NumberMode.SLIDER,
         value_fn=lambda device: getattr(device, "_heating_temperature", 45),  # default value
         set_fn=lambda device, value: setattr(device, "_heating_temperature", value),
+        columns=("HeWatOutTemSet",),
         entity_category=EntityCategory.CONFIG,
         restore_state=True,
     ),
@@ -0,0 +1,154 @@
+"""On-demand profiling of the device sync cycle."""
+
+from __future__ import annotations
+
+# Standard library imports
+import asyncio
+import cProfile
+import functools
+import inspect
+import logging
+import os
+import pstats
+import time
+
+# Local imports
+from . import climate, gree_protocol
+
+_LOGGER = logging.getLogger(__name__)
+
+# Module-level helpers, patched in every module that imported them by name
+PROFILED_FUNCTIONS = ("FetchResult", "Pad", "GetGCMCipher", "EncryptGCM")
+# Entries of the cProfile report included in the service response
+TOP_ENTRIES = 15
+
+_active: SyncProfiler | None = None
+
+
+def _profiled_methods() -> list[str]:
+    return ["SyncState", *(name for name in vars(climate.GreeClimate) if name.startswith("Update"))]
+
+
+class _Timing:
+    __slots__ = ("calls", "total", "max")
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, elapsed):
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "total": round(self.total, 6),
+            "mean": round(self.total / self.calls, 6) if self.calls else None,
+            "max": round(self.max, 6),
+        }
+
+
+class SyncProfiler:
+    """
+    Profiles the event loop thread with cProfile and times the sync cycle functions.
+
+    The timing wrappers are only installed between start() and stop(), so
+    nothing is measured, and nothing costs anything, outside a session.
+    Wall times of coroutines include the time spent waiting for the device.
+    """
+
+    def __init__(self):
+        self._profile = cProfile.Profile()
+        self._timings: dict[str, _Timing] = {}
+        self._patched: list[tuple[object, str, object]] = []
+        self.started = None
+
+    def _wrap(self, key, func):
+        timing = self._timings.setdefault(key, _Timing())
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    timing.add(time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timing.add(time.perf_counter() - started)
+        return wrapper
+
+    def _patch(self, owner, name, key):
+        original = vars(owner)[name]
+        self._patched.append((owner, name, original))
+        setattr(owner, name, self._wrap(key, original))
+
+    def start(self):
+        # Raises ValueError if another profiler (e.g. the profiler integration) is active
+        self._profile.enable()
+        for name in PROFILED_FUNCTIONS:
+            for module in (gree_protocol, climate):
+                if name in vars(module):
+                    self._patch(module, name, name)
+        for name in _profiled_methods():
+            self._patch(climate.GreeClimate, name, name)
+        self.started = time.monotonic()
+
+    def stop(self):
+        self._profile.disable()
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched.clear()
+
+    def timings(self) -> dict[str, dict]:
+        return {key: timing.as_dict() for key, timing in sorted(self._timings.items()) if timing.calls}
+
+    def dump(self, path) -> list[dict]:
+        """Write the pstats file and return the top integration entries by cumulative time (blocking)."""
+        self._profile.dump_stats(path)
+        stats = pstats.Stats(self._profile)
+        package = os.path.dirname(__file__)
+        entries = []
+        for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+            if filename.startswith(package):
+                entries.append({
+                    "function": f"{os.path.basename(filename)}:{line}({function})",
+                    "calls": calls,
+                    "total": round(total, 6),
+                    "cumulative": round(cumulative, 6),
+                })
+        entries.sort(key=lambda entry: entry["cumulative"], reverse=True)
+        return entries[:TOP_ENTRIES]
+
+
+async def async_profile(hass, path, duration) -> dict:
+    """Profile the sync cycle for `duration` seconds and write the cProfile stats to `path`."""
+    global _active
+    if _active is not None:
+        raise RuntimeError("A profiling session is already running")
+    profiler = SyncProfiler()
+    profiler.start()
+    _active = profiler
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        profiler.stop()
+        _active = None
+    top = await hass.async_add_executor_job(profiler.dump, path)
+    _LOGGER.info("Profiled the Gree sync cycle for %ss, stats written to %s", duration, path)
+    return {
+        "file": path,
+        "duration": round(time.monotonic() - profiler.started, 3),
+        "functions": profiler.timings(),
+        "top": top,
+    }
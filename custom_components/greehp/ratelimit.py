@@ -0,0 +1,134 @@
+"""Integration-wide budget for packets sent to Gree devices."""
+
+from __future__ import annotations
+
+# Standard library imports
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+
+# Local imports
+from .const import DATA_STARTUP_GATE, DOMAIN, STARTUP_CONCURRENCY, STARTUP_WINDOW
+
+_LOGGER = logging.getLogger(__name__)
+
+# Lower value goes first
+PRIORITY_COMMAND = 0
+PRIORITY_POLL = 1
+PRIORITY_RETRY = 2
+
+
+class PacketDropped(Exception):
+    """The packet was shed to stay within the packet budget."""
+
+
+class PacketBudget:
+    """
+    Token bucket capping the packets per second sent by the whole integration.
+
+    First attempts wait for a token, commands ahead of polls. Retries only
+    use spare tokens and are shed as soon as anything has to wait, and when
+    the wait queue is full the newest poll makes room for a command.
+    """
+
+    def __init__(self, rate: float, burst: int, max_waiting: int) -> None:
+        self._rate = rate
+        self._burst = burst
+        self._max_waiting = max_waiting
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+        self.sent = 0
+        self.deferred = 0
+        self.dropped = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def _drop(self, reason: str) -> PacketDropped:
+        self.dropped += 1
+        _LOGGER.debug("Packet budget exhausted, dropping %s", reason)
+        return PacketDropped(f"Packet budget exhausted ({reason})")
+
+    async def acquire(self, priority: int = PRIORITY_POLL) -> None:
+        """Wait for a token; raises PacketDropped if the packet is shed."""
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self.sent += 1
+            return
+        if priority >= PRIORITY_RETRY:
+            raise self._drop("retry")
+        if len(self._waiters) >= self._max_waiting:
+            newest = max(self._waiters, key=lambda waiter: (waiter[0], waiter[1]))
+            if newest[0] <= priority:
+                raise self._drop("request")
+            self._waiters.remove(newest)
+            heapq.heapify(self._waiters)
+            if not newest[2].done():
+                newest[2].set_exception(self._drop("queued poll"))
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self.deferred += 1
+        self._schedule()
+        await future
+
+    def _schedule(self) -> None:
+        if self._timer is None and self._waiters:
+            delay = max(0.0, (1 - self._tokens) / self._rate)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._release)
+
+    def _release(self) -> None:
+        self._timer = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # cancelled while waiting
+                continue
+            self._tokens -= 1
+            self.sent += 1
+            future.set_result(None)
+        self._schedule()
+
+    def as_dict(self) -> dict:
+        return {
+            "rate": self._rate,
+            "burst": self._burst,
+            "waiting": len(self._waiters),
+            "sent": self.sent,
+            "deferred": self.deferred,
+            "dropped": self.dropped,
+        }
+
+
+class StartupGate:
+    """Admits the first refresh of each device after a random delay, a few at a time."""
+
+    def __init__(self, window: float, max_concurrent: int) -> None:
+        self._window = window
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    @asynccontextmanager
+    async def admit(self, delay: bool = True):
+        """Hold a slot for the duration of the block; `delay=False` skips the jitter (e.g. after startup)."""
+        if delay and self._window > 0:
+            await asyncio.sleep(random.uniform(0, self._window))
+        async with self._semaphore:
+            yield
+
+
+def async_get_startup_gate(hass) -> StartupGate:
+    """Return the gate shared by all config entries, creating it if needed."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_STARTUP_GATE not in domain_data:
+        domain_data[DATA_STARTUP_GATE] = StartupGate(STARTUP_WINDOW, STARTUP_CONCURRENCY)
+    return domain_data[DATA_STARTUP_GATE]
@@ -0,0 +1,189 @@
+"""
+Relay Gree protocol datagrams over a single TCP connection.
+
+Run it on a host that can reach the devices over UDP (e.g. on their VLAN)
+and point the integration's relay option at it:
+
+    GREE_RELAY_SECRET=... python relay.py --host 192.168.1.5 --allow 10.0.20.0/24
+
+It listens on 127.0.0.1 unless told otherwise, and refuses to start without
+a shared secret (`--secret` or GREE_RELAY_SECRET) or an allowed destination
+subnet (`--allow`). With a secret, every connection starts with a challenge:
+the relay sends CHALLENGE_SIZE random bytes and the client must answer with
+their HMAC-SHA256 under the secret before any request is served. Requests
+are only forwarded to addresses in the allowed subnets (any address if none
+are given) and to the allowed ports (7000 by default).
+
+Each request frame carries a request id, the device address, a timeout and
+the datagram to send; the relay answers with a response frame holding the
+same id, so many requests can be in flight on one connection and replies
+may come back in any order. It has no Home Assistant dependencies.
+"""
+
+# Standard library imports
+import argparse
+import asyncio
+import functools
+import hashlib
+import hmac
+import ipaddress
+import logging
+import os
+import secrets
+import struct
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_RELAY_PORT = 7001
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_DEVICE_PORTS = (7000,)
+SECRET_ENV = "GREE_RELAY_SECRET"
+
+# Sent by the relay on every new connection, answered with the HMAC-SHA256 of it
+CHALLENGE_SIZE = 16
+AUTH_SIZE = hashlib.sha256().digest_size
+
+# <request id><device port><timeout ms><host length><payload length>, then host and payload
+REQUEST_HEADER = struct.Struct("<IHIBI")
+# <request id><status><payload length>, then payload (the reply, or an error message)
+RESPONSE_HEADER = struct.Struct("<IBI")
+
+STATUS_OK = 0
+STATUS_TIMEOUT = 1
+STATUS_ERROR = 2
+
+
+def encode_request(request_id, host, port, timeout, payload):
+    host_bytes = host.encode()
+    return REQUEST_HEADER.pack(request_id, port, int(timeout * 1000), len(host_bytes), len(payload)) + host_bytes + payload
+
+
+def encode_response(request_id, status, payload):
+    return RESPONSE_HEADER.pack(request_id, status, len(payload)) + payload
+
+
+def auth_response(secret, challenge):
+    """Answer to a connection challenge; clients without a secret answer with an empty key."""
+    return hmac.new((secret or "").encode(), challenge, hashlib.sha256).digest()
+
+
+def destination_allowed(host, port, networks=None, ports=None):
+    """Whether requests may be forwarded to `host`:`port`; None allows any network or port."""
+    if ports is not None and port not in ports:
+        return False
+    if networks is None:
+        return True
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False  # host names could resolve anywhere
+    return any(address in network for network in networks)
+
+
+class _ReplyProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.reply = asyncio.get_running_loop().create_future()
+
+    def datagram_received(self, data, addr):
+        if not self.reply.done():
+            self.reply.set_result(data)
+
+    def error_received(self, exc):
+        if not self.reply.done():
+            self.reply.set_exception(exc)
+
+
+async def udp_exchange(host, port, payload, timeout):
+    """Send one datagram and return the first reply from the same address."""
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(_ReplyProtocol, remote_addr=(host, port))
+    try:
+        transport.sendto(payload)
+        return await asyncio.wait_for(protocol.reply, timeout)
+    finally:
+        transport.close()
+
+
+async def _forward(writer, request_id, host, port, timeout, payload):
+    status, response = STATUS_OK, b""
+    try:
+        response = await udp_exchange(host, port, payload, timeout)
+    except asyncio.TimeoutError:
+        status = STATUS_TIMEOUT
+    except OSError as e:
+        status, response = STATUS_ERROR, str(e).encode()
+    if writer.is_closing():
+        return
+    writer.write(encode_response(request_id, status, response))
+    await writer.drain()
+
+
+async def handle_client(reader, writer, secret=None, networks=None, ports=None):
+    """Serve the request frames of one connection until it closes."""
+    peer = writer.get_extra_info("peername")
+    _LOGGER.info("Relay client connected: %s", peer)
+    tasks = set()
+    try:
+        challenge = secrets.token_bytes(CHALLENGE_SIZE)
+        writer.write(challenge)
+        await writer.drain()
+        answer = await reader.readexactly(AUTH_SIZE)
+        if secret and not hmac.compare_digest(answer, auth_response(secret, challenge)):
+            _LOGGER.warning("Relay client %s failed to authenticate", peer)
+            return
+        while True:
+            request_id, port, timeout_ms, host_length, length = REQUEST_HEADER.unpack(await reader.readexactly(REQUEST_HEADER.size))
+            host = (await reader.readexactly(host_length)).decode()
+            payload = await reader.readexactly(length)
+            if not destination_allowed(host, port, networks, ports):
+                _LOGGER.warning("Relay client %s asked for %s:%d, which is not allowed", peer, host, port)
+                writer.write(encode_response(request_id, STATUS_ERROR, b"Destination not allowed"))
+                continue
+            task = asyncio.create_task(_forward(writer, request_id, host, port, timeout_ms / 1000, payload))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        writer.close()
+        _LOGGER.info("Relay client disconnected: %s", peer)
+
+
+async def serve_relay(host=DEFAULT_HOST, port=DEFAULT_RELAY_PORT, secret=None, networks=None, ports=DEFAULT_DEVICE_PORTS):
+    """Serve relay connections until cancelled."""
+    if not secret and networks is None:
+        raise ValueError("Refusing to relay without a secret or allowed networks")
+    handler = functools.partial(
+        handle_client,
+        secret=secret,
+        networks=None if networks is None else [ipaddress.ip_network(network) for network in networks],
+        ports=None if ports is None else set(ports),
+    )
+    server = await asyncio.start_server(handler, host, port)
+    _LOGGER.info("Relaying Gree datagrams on %s:%d", host, port)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gree protocol relay")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_RELAY_PORT)
+    parser.add_argument("--secret", default=os.environ.get(SECRET_ENV), help=f"shared secret clients must prove (default: ${SECRET_ENV})")
+    parser.add_argument("--allow", action="append", type=ipaddress.ip_network, metavar="SUBNET", help="device subnet requests may go to, repeatable")
+    parser.add_argument("--allow-port", action="append", type=int, metavar="PORT", help="device port requests may go to, repeatable (default: 7000)")
+    args = parser.parse_args(argv)
+    if not args.secret and not args.allow:
+        parser.error(f"set a shared secret (--secret or ${SECRET_ENV}) or at least one --allow subnet")
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(serve_relay(args.host, args.port, args.secret, args.allow, args.allow_port or DEFAULT_DEVICE_PORTS))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
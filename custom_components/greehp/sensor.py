@@ -15,11 +15,13 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.const import (
     PERCENTAGE,
+    EntityCategory,
+    UnitOfTime,
 )
 
 
 # Local imports
-from .const import DOMAIN
+from .const import DOMAIN, MODES_MAPPING
 from .entity import GreeEntity, GreeEntityDescription
 
 _LOGGER = logging.getLogger(__name__)
@@ -32,6 +34,14 @@ class GreeSensorEntityDescription(GreeEntityDescription, SensorEntityDescription
     pass
 
 
+RUN_STATES = {0: "off", 1: "on"}
+
+
+def _run_state(device, column):
+    value = device.status_column(column)
+    return None if value is None else RUN_STATES.get(value)
+
+
 SENSORS: tuple[GreeSensorEntityDescription, ...] = (
     GreeSensorEntityDescription(
         property_key="outside_temperature",
@@ -39,6 +49,7 @@ SENSORS: tuple[GreeSensorEntityDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         suggested_display_precision=0,
         value_fn=lambda device: device.outside_temperature if device._has_outside_temp_sensor else None,
+        columns=("OutEnvTem",),
         available_fn=lambda device: device.available and device._has_outside_temp_sensor,
     ),
     GreeSensorEntityDescription(
@@ -48,8 +59,83 @@ SENSORS: tuple[GreeSensorEntityDescription, ...] = (
         native_unit_of_measurement=PERCENTAGE,
         suggested_display_precision=0,
         value_fn=lambda device: device.room_humidity if device._has_room_humidity_sensor else None,
+        columns=("DwatSen",),
         available_fn=lambda device: device.available and device._has_room_humidity_sensor,
     ),
+    GreeSensorEntityDescription(
+        property_key="tank_heating_rate",
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement="°C/min",
+        suggested_display_precision=2,
+        value_fn=lambda device: device.tank_heating_rate,
+        available_fn=lambda device: device.available and device._has_temp_sensor,
+    ),
+    GreeSensorEntityDescription(
+        property_key="tank_time_to_target",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        suggested_display_precision=0,
+        value_fn=lambda device: device.tank_time_to_target,
+        available_fn=lambda device: device.available and device._has_temp_sensor,
+    ),
+    GreeSensorEntityDescription(
+        property_key="water_inlet_temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda device: device.water_inlet_temperature,
+        columns=("AllInWatTemHi", "AllInWatTemLo"),
+        available_fn=lambda device: device.available and device._has_water_inlet_sensor,
+    ),
+    GreeSensorEntityDescription(
+        property_key="water_outlet_temperature",
+        device_class=SensorDeviceClass.TEMPERATURE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda device: device.water_outlet_temperature,
+        columns=("AllOutWatTemHi", "AllOutWatTemLo"),
+        available_fn=lambda device: device.available and device._has_water_outlet_sensor,
+    ),
+    GreeSensorEntityDescription(
+        property_key="compressor_status",
+        device_class=SensorDeviceClass.ENUM,
+        options=list(RUN_STATES.values()),
+        value_fn=lambda device: _run_state(device, "CompRunSta"),
+        columns=("CompRunSta",),
+        available_fn=lambda device: device.available and device.status_column("CompRunSta") is not None,
+    ),
+    GreeSensorEntityDescription(
+        property_key="pump_status",
+        device_class=SensorDeviceClass.ENUM,
+        options=list(RUN_STATES.values()),
+        value_fn=lambda device: _run_state(device, "WatPumpRunSta"),
+        columns=("WatPumpRunSta",),
+        available_fn=lambda device: device.available and device.status_column("WatPumpRunSta") is not None,
+    ),
+    *(
+        GreeSensorEntityDescription(
+            property_key=f"runtime_{mode}",
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            native_unit_of_measurement=UnitOfTime.HOURS,
+            suggested_display_precision=1,
+            entity_registry_enabled_default=mode in ("heat", "cool"),
+            value_fn=lambda device, mode=mode: device.runtime_hours(mode),
+        )
+        for mode in MODES_MAPPING["Mod"]
+    ),
+    GreeSensorEntityDescription(
+        property_key="starts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda device: device.starts,
+    ),
+    GreeSensorEntityDescription(
+        property_key="error_code",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda device: device.status_column("ErrCode"),
+        columns=("ErrCode",),
+        available_fn=lambda device: device.available and device.status_column("ErrCode") is not None,
+    ),
 )
 
 
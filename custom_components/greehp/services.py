@@ -0,0 +1,191 @@
+"""Services for the Gree integration."""
+
+from __future__ import annotations
+
+# Standard library imports
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+# Third-party imports
+import voluptuous as vol
+
+# Home Assistant imports
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+# Local imports
+from .columns import WRITABLE_COLUMNS
+from .const import DOMAIN
+from .profiling import async_profile
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_CAPTURE = "capture"
+SERVICE_BULK_COMMAND = "bulk_command"
+SERVICE_PROFILE = "profile"
+SERVICE_READ_COLUMNS = "read_columns"
+SERVICE_WRITE_COLUMNS = "write_columns"
+
+ATTR_DURATION = "duration"
+ATTR_COMMANDS = "commands"
+ATTR_PARALLELISM = "parallelism"
+ATTR_PACING = "pacing"
+ATTR_COLUMNS = "columns"
+ATTR_VALUES = "values"
+
+# Column names end up verbatim in the request JSON
+COLUMN_NAME = vol.All(cv.string, vol.Match(r"^[A-Za-z][A-Za-z0-9_]*$"))
+
+CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID): cv.comp_entity_ids,
+        vol.Optional(ATTR_DURATION, default=300): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+    }
+)
+
+# Services that change device state have to name their targets
+BULK_COMMAND_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.comp_entity_ids,
+        vol.Required(ATTR_COMMANDS): vol.All(
+            {vol.Optional(column): vol.Coerce(int) for column in WRITABLE_COLUMNS},
+            vol.Length(min=1),
+        ),
+        vol.Optional(ATTR_PARALLELISM, default=8): vol.All(vol.Coerce(int), vol.Range(min=1, max=64)),
+        vol.Optional(ATTR_PACING, default=0.2): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=60): vol.All(vol.Coerce(int), vol.Range(min=1, max=3600)),
+    }
+)
+
+READ_COLUMNS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID): cv.comp_entity_ids,
+        vol.Required(ATTR_COLUMNS): vol.All(cv.ensure_list, [COLUMN_NAME], vol.Length(min=1)),
+    }
+)
+
+WRITE_COLUMNS_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.comp_entity_ids,
+        vol.Required(ATTR_VALUES): vol.All({COLUMN_NAME: vol.Coerce(int)}, vol.Length(min=1)),
+    }
+)
+
+
+def _async_get_devices(hass: HomeAssistant, call: ServiceCall) -> list:
+    """Return the devices targeted by a service call (all devices if the schema allows omitting entity_id)."""
+    entity_ids = call.data.get(ATTR_ENTITY_ID)
+    devices = []
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        entry_data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        if not entry_data:
+            continue
+        device = entry_data["device"]
+        if entity_ids is None or device.entity_id in entity_ids:
+            devices.append(device)
+    if not devices:
+        raise ServiceValidationError("No matching Gree devices")
+    return devices
+
+
+async def _async_capture(call: ServiceCall) -> ServiceResponse:
+    """Record the raw protocol exchanges of devices to capture files in the config directory."""
+    hass = call.hass
+    stamp = dt_util.utcnow().strftime("%Y%m%d%H%M%S")
+    files = {}
+    for device in _async_get_devices(hass, call):
+        path = hass.config.path(f"greehp_capture_{device._sub_mac_addr}_{stamp}.bin")
+        await device.async_start_capture(path, call.data[ATTR_DURATION])
+        files[device.entity_id] = path
+    return {"files": files}
+
+
+async def _async_bulk_command(call: ServiceCall) -> ServiceResponse:
+    """Send the same Gree keys to many devices concurrently."""
+    devices = _async_get_devices(call.hass, call)
+    commands = call.data[ATTR_COMMANDS]
+    pacing = call.data[ATTR_PACING]
+    semaphore = asyncio.Semaphore(call.data[ATTR_PARALLELISM])
+    # Devices behind one host (e.g. VRF sub-units) are sent to one after another, `pacing` seconds apart
+    host_locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+    host_last_sent: dict[str, float] = {}
+
+    async def _async_send(device):
+        host = device._ip_addr
+        async with semaphore, host_locks[host]:
+            wait = host_last_sent.get(host, 0) + pacing - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            started = time.monotonic()
+            result = {"success": True}
+            try:
+                await device.async_send_command(commands)
+            except Exception as e:
+                _LOGGER.warning("%s: bulk command failed: %s", device._name, e)
+                result = {"success": False, "error": f"{type(e).__name__}: {e}"}
+            host_last_sent[host] = time.monotonic()
+            result["latency"] = round(host_last_sent[host] - started, 3)
+            return device.entity_id, result
+
+    results = await asyncio.gather(*(_async_send(device) for device in devices))
+    return {"results": dict(results)}
+
+
+async def _async_for_each_device(call: ServiceCall, action) -> ServiceResponse:
+    """Run `action(device)` on all targeted devices concurrently and collect the per-device results."""
+
+    async def _async_run(device):
+        try:
+            return device.entity_id, {"success": True, "values": await action(device)}
+        except Exception as e:
+            _LOGGER.warning("%s: %s failed: %s", device._name, call.service, e)
+            return device.entity_id, {"success": False, "error": f"{type(e).__name__}: {e}"}
+
+    results = await asyncio.gather(*(_async_run(device) for device in _async_get_devices(call.hass, call)))
+    return {"results": dict(results)}
+
+
+async def _async_read_columns(call: ServiceCall) -> ServiceResponse:
+    """Read any Gree columns, one status request per device."""
+    columns = list(dict.fromkeys(call.data[ATTR_COLUMNS]))
+    return await _async_for_each_device(call, lambda device: device.async_read_columns(columns))
+
+
+async def _async_write_columns(call: ServiceCall) -> ServiceResponse:
+    """Write any Gree columns, one cmd request per device, and return the values the devices report."""
+    values = call.data[ATTR_VALUES]
+
+    async def _async_write(device):
+        await device.async_send_command(values)
+        return {name: device._acOptions.get(name) for name in values}
+
+    return await _async_for_each_device(call, _async_write)
+
+
+async def _async_profile(call: ServiceCall) -> ServiceResponse:
+    """Profile the device sync cycles for a while and write a pstats file to the config directory."""
+    hass = call.hass
+    path = hass.config.path(f"greehp_profile_{dt_util.utcnow().strftime('%Y%m%d%H%M%S')}.prof")
+    try:
+        return await async_profile(hass, path, call.data[ATTR_DURATION])
+    except (RuntimeError, ValueError) as e:
+        raise HomeAssistantError(f"Cannot start profiling: {e}") from e
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+    hass.services.async_register(DOMAIN, SERVICE_CAPTURE, _async_capture, schema=CAPTURE_SCHEMA, supports_response=SupportsResponse.OPTIONAL)
+    hass.services.async_register(DOMAIN, SERVICE_BULK_COMMAND, _async_bulk_command, schema=BULK_COMMAND_SCHEMA, supports_response=SupportsResponse.OPTIONAL)
+    hass.services.async_register(DOMAIN, SERVICE_READ_COLUMNS, _async_read_columns, schema=READ_COLUMNS_SCHEMA, supports_response=SupportsResponse.OPTIONAL)
+    hass.services.async_register(DOMAIN, SERVICE_WRITE_COLUMNS, _async_write_columns, schema=WRITE_COLUMNS_SCHEMA, supports_response=SupportsResponse.OPTIONAL)
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, _async_profile, schema=PROFILE_SCHEMA, supports_response=SupportsResponse.OPTIONAL)
@@ -0,0 +1,58 @@
+"""Persistent per-device storage for the Gree integration."""
+
+from __future__ import annotations
+
+# Standard library imports
+import time
+from typing import Any
+
+# Home Assistant imports
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+# Local imports
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+
+class GreeDeviceStore:
+    """Sections of persisted data for one device, stored per MAC."""
+
+    def __init__(self, hass: HomeAssistant, mac_addr: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{mac_addr}")
+        self._data: dict[str, Any] = {}
+        self._save_due: float | None = None
+        self.loaded = False
+
+    async def async_load(self) -> dict[str, Any]:
+        """Load the stored sections, once."""
+        if not self.loaded:
+            self._data = await self._store.async_load() or {}
+            self.loaded = True
+        return self._data
+
+    def get(self, section: str, default: Any = None) -> Any:
+        return self._data.get(section, default)
+
+    def set(self, section: str, value: Any, delay: float = SAVE_DELAY) -> None:
+        """Update a section and schedule a delayed write.
+
+        All sections share one file and one pending write: a write that is
+        already scheduled is only moved earlier, never pushed back, and it
+        picks up every section updated before it runs.
+        """
+        self._data[section] = value
+        due = time.monotonic() + delay
+        if self._save_due is None or due < self._save_due:
+            self._save_due = due
+            self._store.async_delay_save(self._data_to_save, delay)
+
+    def _data_to_save(self) -> dict[str, Any]:
+        self._save_due = None
+        return self._data
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
+        self._data = {}
@@ -0,0 +1,119 @@
+"""In-memory telemetry history for Gree devices."""
+
+from __future__ import annotations
+
+# Standard library imports
+from collections.abc import Mapping
+
+# Third-party imports
+import numpy as np
+
+# Numeric values sampled after every successful poll (temperatures in °C)
+TELEMETRY_CHANNELS = (
+    "tank_temperature",
+    "outside_temperature",
+    "WatBoxTemSet",
+    "HeWatOutTemSet",
+    "Pow",
+    "Mod",
+)
+# One day of samples at the default 60s poll interval
+DEFAULT_CAPACITY = 1440
+
+
+class TelemetryBuffer:
+    """
+    Fixed-size ring buffer of timestamped samples, one column per channel.
+
+    Storage is preallocated, so memory per device stays constant no matter
+    how long it runs. Missing values are stored as NaN and skipped by the
+    accessors.
+    """
+
+    def __init__(self, channels=TELEMETRY_CHANNELS, capacity: int = DEFAULT_CAPACITY):
+        self.channels = tuple(channels)
+        self._channel_index = {channel: index for index, channel in enumerate(self.channels)}
+        self._capacity = capacity
+        self._times = np.full(capacity, np.nan)
+        self._values = np.full((capacity, len(self.channels)), np.nan)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, values: Mapping[str, float | None]) -> None:
+        """Add a sample, overwriting the oldest one once the buffer is full."""
+        row = self._values[self._next]
+        row.fill(np.nan)
+        for channel, value in values.items():
+            index = self._channel_index.get(channel)
+            if index is not None and value is not None:
+                row[index] = value
+        self._times[self._next] = timestamp
+        self._next = (self._next + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+
+    def clear(self) -> None:
+        self._times.fill(np.nan)
+        self._values.fill(np.nan)
+        self._next = 0
+        self._count = 0
+
+    def _order(self) -> np.ndarray:
+        start = (self._next - self._count) % self._capacity
+        return (np.arange(self._count) + start) % self._capacity
+
+    def window(self, channel: str, seconds: float | None = None, now: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return (timestamps, values) of a channel, oldest first, without missing samples."""
+        order = self._order()
+        times = self._times[order]
+        values = self._values[order, self._channel_index[channel]]
+        mask = ~np.isnan(values)
+        if seconds is not None and self._count:
+            if now is None:
+                now = times[-1]
+            mask &= times >= now - seconds
+        return times[mask], values[mask]
+
+    def min(self, channel: str, seconds: float | None = None) -> float | None:
+        _, values = self.window(channel, seconds)
+        return float(values.min()) if values.size else None
+
+    def max(self, channel: str, seconds: float | None = None) -> float | None:
+        _, values = self.window(channel, seconds)
+        return float(values.max()) if values.size else None
+
+    def mean(self, channel: str, seconds: float | None = None) -> float | None:
+        _, values = self.window(channel, seconds)
+        return float(values.mean()) if values.size else None
+
+    def slope(self, channel: str, seconds: float | None = None) -> float | None:
+        """Least-squares slope of a channel, in units per second."""
+        times, values = self.window(channel, seconds)
+        if values.size < 2:
+            return None
+        centered = times - times.mean()
+        denominator = float(np.dot(centered, centered))
+        if denominator == 0:
+            return None
+        return float(np.dot(centered, values - values.mean()) / denominator)
+
+    def summary(self, channel: str, seconds: float | None = None) -> dict[str, float | int | None]:
+        """Return min/max/mean/slope of a channel over a window in one pass over the data."""
+        times, values = self.window(channel, seconds)
+        if not values.size:
+            return {"samples": 0, "min": None, "max": None, "mean": None, "slope": None}
+        slope = None
+        if values.size >= 2:
+            centered = times - times.mean()
+            denominator = float(np.dot(centered, centered))
+            if denominator:
+                slope = float(np.dot(centered, values - values.mean()) / denominator)
+        return {
+            "samples": int(values.size),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "mean": float(values.mean()),
+            "slope": slope,
+        }
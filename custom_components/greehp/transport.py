@@ -0,0 +1,125 @@
+"""Transports carrying Gree protocol datagrams to devices."""
+
+from __future__ import annotations
+
+# Standard library imports
+import asyncio
+import itertools
+import logging
+import socket
+
+# Local imports
+from .relay import CHALLENGE_SIZE, DEFAULT_RELAY_PORT, RESPONSE_HEADER, STATUS_OK, STATUS_TIMEOUT, auth_response, encode_request
+
+_LOGGER = logging.getLogger(__name__)
+
+# Time to open the relay connection, and extra time the relay gets on top of the device timeout
+RELAY_CONNECT_TIMEOUT = 5
+RELAY_GRACE = 1
+
+
+class UdpTransport:
+    """Sends each request straight to the device over UDP (the default)."""
+
+    async def exchange(self, ip_addr: str, port: int, payload: bytes, timeout: float) -> bytes:
+        """Send one datagram and return the reply."""
+        clientSock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            clientSock.settimeout(timeout)
+            clientSock.sendto(payload, (ip_addr, port))
+            # Receive response with event loop yielding
+            data, _ = await asyncio.wait_for(asyncio.get_event_loop().run_in_executor(None, clientSock.recvfrom, 64000), timeout=timeout)
+            return data
+        finally:
+            try:
+                clientSock.close()
+            except Exception as e:
+                _LOGGER.debug(f"Error closing socket: {str(e)}")
+
+    async def async_close(self) -> None:
+        pass
+
+
+class RelayTransport:
+    """Multiplexes requests over one persistent TCP connection to a relay (see relay.py)."""
+
+    def __init__(self, host: str, port: int = DEFAULT_RELAY_PORT, secret: str | None = None) -> None:
+        self.host = host
+        self.port = port
+        self._secret = secret
+        self._writer: asyncio.StreamWriter | None = None
+        self._read_task: asyncio.Task | None = None
+        self._connect_lock = asyncio.Lock()
+        self._pending: dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+
+    async def _async_connect(self) -> asyncio.StreamWriter:
+        async with self._connect_lock:
+            if self._writer is None or self._writer.is_closing():
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), RELAY_CONNECT_TIMEOUT)
+                try:
+                    # Prove the shared secret before sending any request
+                    challenge = await asyncio.wait_for(reader.readexactly(CHALLENGE_SIZE), RELAY_CONNECT_TIMEOUT)
+                    writer.write(auth_response(self._secret, challenge))
+                    await writer.drain()
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    writer.close()
+                    raise ConnectionError(f"Relay {self.host}:{self.port} did not send a challenge")
+                self._writer = writer
+                self._read_task = asyncio.get_running_loop().create_task(self._async_read(reader, self._writer))
+                _LOGGER.debug("Connected to Gree relay %s:%d", self.host, self.port)
+            return self._writer
+
+    async def _async_read(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Hand each response frame to the request waiting for its id."""
+        try:
+            while True:
+                request_id, status, length = RESPONSE_HEADER.unpack(await reader.readexactly(RESPONSE_HEADER.size))
+                payload = await reader.readexactly(length)
+                future = self._pending.pop(request_id, None)
+                if future is None or future.done():
+                    continue  # the request gave up already
+                if status == STATUS_OK:
+                    future.set_result(payload)
+                elif status == STATUS_TIMEOUT:
+                    future.set_exception(asyncio.TimeoutError())
+                else:
+                    future.set_exception(OSError(payload.decode(errors="replace")))
+        except (asyncio.IncompleteReadError, ConnectionError) as e:
+            _LOGGER.debug("Connection to Gree relay %s:%d lost: %s", self.host, self.port, e)
+        finally:
+            if self._writer is writer:
+                self._writer = None
+            writer.close()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Relay connection lost"))
+            self._pending.clear()
+
+    async def exchange(self, ip_addr: str, port: int, payload: bytes, timeout: float) -> bytes:
+        """Send one datagram through the relay and return the reply."""
+        writer = await self._async_connect()
+        request_id = next(self._ids) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            writer.write(encode_request(request_id, ip_addr, port, timeout, payload))
+            await writer.drain()
+            return await asyncio.wait_for(future, timeout + RELAY_GRACE)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def async_close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+
+
+def parse_relay(value: str) -> tuple[str, int]:
+    """Split a `host[:port]` relay address."""
+    host, _, port = value.strip().rpartition(":")
+    if not host:
+        return port, DEFAULT_RELAY_PORT
+    return host, int(port)